@@ -11,15 +11,73 @@ DB_NAME = os.getenv("DB_NAME")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", "0"))
+DB_RESERVED_CONNECTIONS = int(os.getenv("DB_RESERVED_CONNECTIONS", "10"))
+WORKERS = int(os.getenv("WORKERS", "1"))
+
+DB_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_REPLICA_STICKINESS_SECONDS = int(os.getenv("DB_REPLICA_STICKINESS_SECONDS", "5"))
+
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "2000"))
+DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "500"))
+DB_LIST_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_LIST_STATEMENT_TIMEOUT_MS", "1000"))
+
+COUNT_EXACT_THRESHOLD = int(os.getenv("COUNT_EXACT_THRESHOLD", "10000"))
+COUNT_CACHE_SECONDS = int(os.getenv("COUNT_CACHE_SECONDS", "60"))
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1000"))
+COUNT_MAX_REFRESHES = int(os.getenv("COUNT_MAX_REFRESHES", "2"))
+
 # LOGGING PARAMETER
 LOG_LEVEL = os.environ.get("LOG_LEVEL")
 
 # JWT SECRET KEY
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
+# JWT SIGNING KEYS (RS256, <kid>.pem files; HS256 with SECRET_KEY when unset)
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+JWT_ACCEPT_HS256 = os.getenv("JWT_ACCEPT_HS256", "true").lower() == "true"
+JWKS_CACHE_SECONDS = int(os.getenv("JWKS_CACHE_SECONDS", "300"))
+
 # TOKENS_LIFETIME
 ACCESS_TOKEN_LIVE = os.environ.get("ACCESS_TOKEN_LIVE")
 REFRESH_TOKEN_LIVE = os.environ.get("REFRESH_TOKEN_LIVE")
 
+# PASSWORD HASHING POOL
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", "32"))
+PASSWORD_ROUNDS = int(os.getenv("PASSWORD_ROUNDS", "12"))
+PASSWORD_HASH_TARGET_MS = int(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+PASSWORD_MIN_ROUNDS = int(os.getenv("PASSWORD_MIN_ROUNDS", "10"))
+PASSWORD_MAX_ROUNDS = int(os.getenv("PASSWORD_MAX_ROUNDS", "14"))
+# Workers a batch may use at once, and the time a batch may take: larger
+# batches are rejected with 413 (max ~ timeout / hash time * batch workers).
+PASSWORD_BATCH_WORKERS = int(os.getenv("PASSWORD_BATCH_WORKERS", str(PASSWORD_WORKERS)))
+PASSWORD_BATCH_TIMEOUT_SECONDS = int(os.getenv("PASSWORD_BATCH_TIMEOUT_SECONDS", "30"))
+
+# VERIFIED TOKEN CLAIMS CACHE
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_SECONDS = int(os.getenv("TOKEN_CACHE_SECONDS", "900"))
+
+# AUTHENTICATED USER CACHE
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_LOCAL_SECONDS = int(os.getenv("USER_CACHE_LOCAL_SECONDS", "30"))
+USER_CACHE_REDIS_SECONDS = int(os.getenv("USER_CACHE_REDIS_SECONDS", "300"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+# Connect and read timeout for the shared tier; past it the request falls
+# back to the database instead of waiting for the OS TCP timeout.
+USER_CACHE_REDIS_TIMEOUT_SECONDS = float(os.getenv("USER_CACHE_REDIS_TIMEOUT_SECONDS", "0.2"))
+
+# REFRESH TOKEN BLACKLIST FILTER
+BLACKLIST_FILTER_CAPACITY = int(os.getenv("BLACKLIST_FILTER_CAPACITY", "100000"))
+BLACKLIST_FILTER_ERROR_RATE = float(os.getenv("BLACKLIST_FILTER_ERROR_RATE", "0.001"))
+BLACKLIST_SYNC_SECONDS = int(os.getenv("BLACKLIST_SYNC_SECONDS", "5"))
+BLACKLIST_REBUILD_SECONDS = int(os.getenv("BLACKLIST_REBUILD_SECONDS", "3600"))
+
 #UPLOAD DIR
 UPLOAD_DIR = os.environ.get("UPLOAD_DIR")
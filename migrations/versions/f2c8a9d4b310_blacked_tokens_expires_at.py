@@ -0,0 +1,34 @@
+"""blacked tokens expires_at
+
+Revision ID: f2c8a9d4b310
+Revises: e93b5f17c6a2
+Create Date: 2025-09-16 09:47:21.603418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8a9d4b310'
+down_revision: Union[str, Sequence[str], None] = 'e93b5f17c6a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacked_refresh_tokens', sa.Column('expires_at', sa.DateTime(), nullable=True))
+    # Existing rows were blacklisted when they were already expired,
+    # so their creation time is a safe upper bound for the expiry.
+    op.execute('UPDATE blacked_refresh_tokens SET expires_at = COALESCE(created_at, now())')
+    op.alter_column('blacked_refresh_tokens', 'expires_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index(op.f('ix_blacked_refresh_tokens_expires_at'), 'blacked_refresh_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_blacked_refresh_tokens_expires_at'), table_name='blacked_refresh_tokens')
+    op.drop_column('blacked_refresh_tokens', 'expires_at')
@@ -203,7 +203,8 @@ start_server() {
     APP_HOST=${APP_HOST:-0.0.0.0}
     APP_PORT=${APP_PORT:-8000}
     DEBUG=${DEBUG:-true}
-    WORKERS=${WORKERS:-4}
+    # Exported so each worker can size its DB pool from DB_CONNECTION_BUDGET
+    export WORKERS=${WORKERS:-4}
     WORKER_CLASS=${WORKER_CLASS:-uvicorn.workers.UvicornWorker}
     TIMEOUT=${TIMEOUT:-120}
     KEEPALIVE=${KEEPALIVE:-5}
@@ -283,6 +284,7 @@ show_help() {
     echo "  DEBUG               Enable debug mode (default: true)"
     echo "  ENVIRONMENT         Environment name (development/production/docker)"
     echo "  WORKERS             Number of gunicorn workers (default: 4)"
+    echo "  DB_CONNECTION_BUDGET Total Postgres connections shared by all workers (default: 0, fixed pool size)"
     echo "  WORKER_CLASS        Gunicorn worker class (default: uvicorn.workers.UvicornWorker)"
     echo "  TIMEOUT             Worker timeout in seconds (default: 120)"
     echo "  KEEPALIVE           Keepalive timeout in seconds (default: 5)"
@@ -1,12 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from logging import getLogger
+
 from fastapi import FastAPI
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from logger import setup_logger
-from src.auth.routers import auth_router
+from src.auth.blacklist import keep_blacklist_in_sync, rebuild_blacklist
+from src.auth.passwords import calibrate_password_hashing, shutdown_password_pool
+from src.auth.routers import auth_dependency, auth_router
+from src.database.connection import engines_pool_stats
+from src.database.deadlines import database_error_handler, pool_timeout_handler
+from src.database.instrumentation import query_stats_middleware
+from src.database.routing import replica_stickiness_middleware
 from src.user.routers import user_router
 
 setup_logger()
-app = FastAPI()
+logger = getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await calibrate_password_hashing()
+    try:
+        await rebuild_blacklist()
+    except Exception:
+        # Without the filter every refresh token is checked in the
+        # database; the sync task retries the load.
+        logger.exception("Loading the refresh token blacklist failed")
+    blacklist_sync = asyncio.create_task(keep_blacklist_in_sync())
+    yield
+    blacklist_sync.cancel()
+    with suppress(asyncio.CancelledError):
+        await blacklist_sync
+    shutdown_password_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+app.middleware("http")(query_stats_middleware)
+app.middleware("http")(replica_stickiness_middleware)
+app.add_exception_handler(DBAPIError, database_error_handler)
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
 app.include_router(user_router)
 
 app.include_router(auth_router)
 
+
+@app.get("/metrics/db-pool", include_in_schema=False)
+async def db_pool_metrics(user: auth_dependency):
+    return engines_pool_stats()
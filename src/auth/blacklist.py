@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import math
+from datetime import datetime, timedelta
+from logging import getLogger
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import (
+    BLACKLIST_FILTER_CAPACITY,
+    BLACKLIST_FILTER_ERROR_RATE,
+    BLACKLIST_REBUILD_SECONDS,
+    BLACKLIST_SYNC_SECONDS,
+)
+from src.database.connection import with_db_session
+from src.user.models import BlackedRefreshTokens
+
+logger = getLogger(__name__)
+
+# created_at is stamped before the row commits, so a sync that only read
+# rows newer than the last one seen could miss a slow transaction.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(capacity, 1)
+        self.size = math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        # Syncs re-read an overlap window, so most items arrive again;
+        # counting only new ones keeps count close to the distinct total
+        # that the capacity check compares against.
+        if item in self:
+            return
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RefreshTokenBlacklist:
+
+    def __init__(
+            self,
+            capacity: int = BLACKLIST_FILTER_CAPACITY,
+            error_rate: float = BLACKLIST_FILTER_ERROR_RATE,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter: BloomFilter | None = None
+        self._synced_at: datetime | None = None
+        self._pending: list[str] | None = None
+
+    def might_contain(self, token: str) -> bool:
+        # Until the first load every token has to be checked in the database.
+        return self._filter is None or token in self._filter
+
+    def add(self, token: str) -> None:
+        if self._filter is not None:
+            self._filter.add(token)
+        if self._pending is not None:
+            self._pending.append(token)
+
+    async def contains(self, session: AsyncSession, token: str) -> bool:
+        if not self.might_contain(token):
+            return False
+        return await BlackedRefreshTokens.get_by_field(session, "token", token) is not None
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        rows = await session.scalar(select(func.count()).select_from(BlackedRefreshTokens))
+        # Sized with headroom so inserts until the next rebuild keep the
+        # false positive rate near the configured one.
+        bloom = BloomFilter(max(self.capacity, rows * 2), self.error_rate)
+        # Tokens added locally while the table is read go into the new
+        # filter as well, whether or not the read already saw them.
+        self._pending = []
+        try:
+            synced_at = await self._load(session, bloom)
+            for token in self._pending:
+                bloom.add(token)
+        finally:
+            self._pending = None
+
+        self._filter = bloom
+        self._synced_at = synced_at
+        logger.info("Refresh token blacklist filter rebuilt with %s tokens", bloom.count)
+
+    async def sync(self, session: AsyncSession) -> None:
+        if self._filter is None or self._filter.count > self._filter.capacity:
+            await self.rebuild(session)
+            return
+        self._synced_at = await self._load(session, self._filter, since=self._synced_at)
+
+    async def _load(
+            self,
+            session: AsyncSession,
+            bloom: BloomFilter,
+            since: datetime | None = None,
+    ) -> datetime | None:
+        query = select(BlackedRefreshTokens.token, BlackedRefreshTokens.created_at)
+        if since is not None:
+            query = query.where(BlackedRefreshTokens.created_at >= since - SYNC_OVERLAP)
+
+        latest = since
+        result = await session.stream(query.execution_options(yield_per=5000))
+        async for token, created_at in result:
+            bloom.add(token)
+            if created_at is not None and (latest is None or created_at > latest):
+                latest = created_at
+        return latest
+
+
+refresh_blacklist = RefreshTokenBlacklist()
+
+
+@with_db_session
+async def rebuild_blacklist(session=None) -> None:
+    await refresh_blacklist.rebuild(session)
+
+
+@with_db_session
+async def sync_blacklist(session=None) -> None:
+    await refresh_blacklist.sync(session)
+
+
+async def keep_blacklist_in_sync(
+        sync_seconds: float = BLACKLIST_SYNC_SECONDS,
+        rebuild_seconds: float = BLACKLIST_REBUILD_SECONDS,
+) -> None:
+    # Other workers blacklist tokens too, and a Bloom filter cannot forget
+    # pruned ones, so deltas are pulled often and the filter is rebuilt
+    # from scratch now and then.
+    loop = asyncio.get_running_loop()
+    rebuilt_at = loop.time()
+    while True:
+        await asyncio.sleep(sync_seconds)
+        try:
+            if loop.time() - rebuilt_at >= rebuild_seconds:
+                await rebuild_blacklist()
+                rebuilt_at = loop.time()
+            else:
+                await sync_blacklist()
+        except Exception:
+            logger.exception("Refresh token blacklist sync failed")
@@ -0,0 +1,184 @@
+import asyncio
+import math
+import multiprocessing
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from logging import getLogger
+from time import perf_counter
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from config import (
+    PASSWORD_BATCH_TIMEOUT_SECONDS,
+    PASSWORD_BATCH_WORKERS,
+    PASSWORD_HASH_TARGET_MS,
+    PASSWORD_MAX_ROUNDS,
+    PASSWORD_MIN_ROUNDS,
+    PASSWORD_QUEUE_SIZE,
+    PASSWORD_ROUNDS,
+    PASSWORD_WORKERS,
+)
+
+logger = getLogger(__name__)
+
+# Small chunks: a login queued behind a batch waits for one chunk only.
+BATCH_CHUNK_SIZE = 4
+CALIBRATION_SAMPLES = 5
+
+
+@lru_cache
+def _context(rounds: int) -> CryptContext:
+    # Workers calibrate on their own and can land one round apart, so a
+    # hash one round cheaper or any costlier one is kept: needs_update()
+    # only flags clearly weaker hashes and workers never rehash each
+    # other's hashes back and forth.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=min(rounds, max(rounds - 1, PASSWORD_MIN_ROUNDS)),
+        bcrypt__max_rounds=max(rounds, PASSWORD_MAX_ROUNDS),
+    )
+
+
+pwd_context = _context(PASSWORD_ROUNDS)
+
+_executor: ProcessPoolExecutor | None = None
+_in_flight = 0
+# Seconds per hash at the current cost, measured at startup.
+_hash_seconds: float | None = None
+
+
+# The worker processes never see the calibrated policy, so the cost
+# travels with every hashing call.
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _hash_many(passwords: list[str], rounds: int) -> list[str]:
+    context = _context(rounds)
+    return [context.hash(password) for password in passwords]
+
+
+def _verify(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+
+def _time_hash(rounds: int) -> float:
+    started_at = perf_counter()
+    _context(rounds).hash("calibration")
+    return perf_counter() - started_at
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that already runs an event loop and
+        # database pools would copy their sockets into every worker.
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    global _in_flight
+    # Bcrypt work is CPU bound: once every worker is busy and the queue is
+    # full, waiting longer only delays the answer, so reject right away.
+    if _in_flight >= PASSWORD_WORKERS + PASSWORD_QUEUE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password operations in progress",
+            headers={"Retry-After": "1"},
+        )
+
+    _in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), func, *args)
+    finally:
+        _in_flight -= 1
+
+
+def _current_rounds() -> int:
+    return pwd_context.handler("bcrypt").default_rounds
+
+
+async def calibrate_password_hashing() -> int:
+    global pwd_context, _hash_seconds
+    if PASSWORD_HASH_TARGET_MS <= 0:
+        _hash_seconds = await _run(_time_hash, _current_rounds())
+        return _current_rounds()
+
+    # Each extra bcrypt round doubles the cost, so samples at the minimum
+    # cost extrapolate to the target; the median ignores a sample slowed
+    # down by a busy host.
+    elapsed = statistics.median([
+        await _run(_time_hash, PASSWORD_MIN_ROUNDS) for _ in range(CALIBRATION_SAMPLES)
+    ])
+    extra = math.floor(math.log2(PASSWORD_HASH_TARGET_MS / 1000 / elapsed))
+    rounds = min(max(PASSWORD_MIN_ROUNDS + extra, PASSWORD_MIN_ROUNDS), PASSWORD_MAX_ROUNDS)
+
+    pwd_context = _context(rounds)
+    _hash_seconds = elapsed * 2 ** (rounds - PASSWORD_MIN_ROUNDS)
+    logger.info(
+        "Password hashing calibrated to %s bcrypt rounds (%.1f ms at %s rounds)",
+        rounds, elapsed * 1000, PASSWORD_MIN_ROUNDS,
+    )
+    return rounds
+
+
+def needs_rehash(password_hash: str) -> bool:
+    return pwd_context.needs_update(password_hash)
+
+
+async def hash_password(password: str) -> str:
+    return await _run(_hash, password, _current_rounds())
+
+
+async def verify_password(password: str, password_hash: str) -> bool:
+    return await _run(_verify, password, password_hash)
+
+
+def _batch_workers() -> int:
+    return max(1, min(PASSWORD_BATCH_WORKERS, PASSWORD_WORKERS))
+
+
+def max_batch_size() -> int | None:
+    # Each batch worker hashes its share one password after another.
+    if _hash_seconds is None:
+        return None
+    return max(1, int(PASSWORD_BATCH_TIMEOUT_SECONDS / _hash_seconds)) * _batch_workers()
+
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    limit = max_batch_size()
+    if limit is not None and len(passwords) > limit:
+        # Rejected before any work: hashing it would outlast the request.
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many passwords to hash in one request (max {limit})",
+        )
+
+    parallel = asyncio.Semaphore(_batch_workers())
+    rounds = _current_rounds()
+
+    async def hash_chunk(chunk: list[str]) -> list[str]:
+        async with parallel:
+            return await _run(_hash_many, chunk, rounds)
+
+    iterator = iter(passwords)
+    chunks = iter(lambda: list(islice(iterator, BATCH_CHUNK_SIZE)), [])
+    hashed = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+    return [password_hash for chunk in hashed for password_hash in chunk]
@@ -1,15 +1,17 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Cookie, Depends, Response
 
-from config import ACCESS_TOKEN_LIVE
-from src.auth.schemas import UserLogin
+from config import JWKS_CACHE_SECONDS
+from src.auth.schemas import TokenRefresh, UserLogin
 from src.auth.services import AuthService
-from src.database.connection import db_dependency
+from src.auth.tokens_processing import key_set
+from src.database.connection import UnitOfWorkRoute, db_dependency
 from src.user.models import User
 
 auth_router = APIRouter(
     tags=["auth"],
+    route_class=UnitOfWorkRoute,
 )
 auth_dependency = Annotated[User, Depends(AuthService.get_current_user)]
 
@@ -20,29 +22,29 @@ async def login_user(
         session: db_dependency
 ):
     tokens = await AuthService.login_user(user, session)
-
-    response.set_cookie(
-        key="auth_token",
-        value=tokens["access_token"],
-        httponly=False,
-        secure=False,  # True для production
-        samesite="lax",
-        max_age=int(ACCESS_TOKEN_LIVE) * 60,
-    )
-    response.set_cookie(
-        key="refresh_token",
-        value=tokens["refresh_token"],
-        httponly=True,
-        secure=False,
-        samesite="lax",
-        max_age=2592000,
-    )
+    AuthService.set_token_cookies(response, tokens["access_token"], tokens["refresh_token"])
 
     return {
         "access_token": tokens["access_token"],
         "refresh_token": tokens["refresh_token"],
     }
 
+@auth_router.post("/token/refresh")
+async def refresh_tokens(
+        response: Response,
+        session: db_dependency,
+        body: TokenRefresh | None = None,
+        rotate: bool = False,
+        refresh_token: str | None = Cookie(alias="refresh_token", default=None),
+):
+    # Clients without cookies send the refresh token from /login in the body.
+    if body is not None and body.refresh_token:
+        refresh_token = body.refresh_token
+    tokens = await AuthService.refresh_tokens(session, refresh_token, rotate=rotate)
+    AuthService.set_token_cookies(response, tokens["access_token"], tokens["refresh_token"])
+
+    return tokens
+
 @auth_router.get("/protected_root")
 async def protected_root(user: auth_dependency):
     return {"message": f"Hello, {user.name}!"}
@@ -52,3 +54,8 @@ async def logout_user(response: Response):
     response.delete_cookie("auth_token")
     response.delete_cookie("refresh_token")
     return {"message": "Logged out successfully"}
+
+@auth_router.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={JWKS_CACHE_SECONDS}"
+    return key_set.jwks
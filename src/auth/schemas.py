@@ -4,3 +4,7 @@ from pydantic import BaseModel
 class UserLogin(BaseModel):
     email: str
     password: str
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str | None = None
@@ -1,20 +1,24 @@
+import asyncio
 from datetime import UTC, datetime, timedelta
 from logging import getLogger
 from time import perf_counter
+from uuid import UUID, uuid4
 
 from fastapi import Cookie, HTTPException, Response
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jose import JWTError
 
-from config import ACCESS_TOKEN_LIVE, SECRET_KEY
+from config import ACCESS_TOKEN_LIVE
+from src.auth.blacklist import refresh_blacklist
+from src.auth.passwords import needs_rehash, verify_password
 from src.auth.schemas import UserLogin
-from src.database.connection import db_dependency
+from src.auth.tokens_processing import decode_token, encode_token, forget_token
+from src.database.connection import db_dependency, on_commit
 from src.user.models import BlackedRefreshTokens, UserRefreshTokens
 from src.user.services import UserService
 
 logger = getLogger(__name__)
 
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_background_tasks: set[asyncio.Task] = set()
 
 class AuthService:
     @staticmethod
@@ -23,8 +27,17 @@ class AuthService:
         if not db_user:
             return False
 
-        if not bcrypt_context.verify(password, db_user.password_hash):
+        if not await verify_password(password, db_user.password_hash):
             return False
+
+        if needs_rehash(db_user.password_hash):
+            # Runs after the response with its own session, so the login
+            # never waits for the new hash.
+            task = asyncio.create_task(UserService.rehash_password(
+                db_user.id, password, db_user.password_hash
+            ))
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
         return db_user
 
     @staticmethod
@@ -36,7 +49,7 @@ class AuthService:
         }
         expires = datetime.now(UTC).replace(tzinfo=None) + expiration
         encode.update({"exp": expires})
-        result = jwt.encode(encode, SECRET_KEY, "HS256")
+        result = encode_token(encode)
         time_end = perf_counter()
         print(f'Time to generate JWT: {time_end - time_start} ms')
         return result
@@ -46,11 +59,11 @@ class AuthService:
         try:
             if not token:
                 return False
-            payload = jwt.decode(token, SECRET_KEY, "HS256")
+            payload = decode_token(token)
             expiration_date = payload.get("exp")
             user_id = payload.get("user_id")
             if payload.get('token_type') == 'refresh':
-                if await BlackedRefreshTokens.get_by_field(session, 'token', token):
+                if await refresh_blacklist.contains(session, token):
                     return False
 
             if expiration_date is None:
@@ -60,13 +73,114 @@ class AuthService:
                 await BlackedRefreshTokens.create({
                     'token': token,
                     'user_id': user_id,
+                    'expires_at': datetime.fromtimestamp(expiration_date, UTC).replace(tzinfo=None),
                 },
-                session)
+                session,
+                ignore_conflicts=True)
+                refresh_blacklist.add(token)
                 return False
             return True
         except JWTError:
             return False
 
+    @staticmethod
+    def set_token_cookies(response: Response, access_token: str, refresh_token: str | None = None):
+        response.set_cookie(
+            key="auth_token",
+            value=access_token,
+            httponly=False,
+            secure=False,  # True для production
+            samesite="lax",
+            max_age=int(ACCESS_TOKEN_LIVE) * 60,
+        )
+        if refresh_token is not None:
+            response.set_cookie(
+                key="refresh_token",
+                value=refresh_token,
+                httponly=True,
+                secure=False,
+                samesite="lax",
+                max_age=2592000,
+            )
+
+    @staticmethod
+    async def get_refresh_claims(session: db_dependency, refresh_token: str | None) -> dict:
+        if not await AuthService.validate_jwt_token(session, refresh_token):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+        # validate_jwt_token verified the signature and cached the claims.
+        claims = decode_token(refresh_token)
+        if claims.get('token_type') != 'refresh':
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        return claims
+
+    @staticmethod
+    async def ensure_current_refresh_token(session: db_dependency, refresh_token: str, claims: dict):
+        # Other workers learn about a rotation only at the next blacklist
+        # sync, while the stored token changes as soon as it is committed.
+        stored = await UserRefreshTokens.get_by_field(session, 'token', refresh_token)
+        if stored is None or str(stored.user_id) != claims['user_id']:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+    @staticmethod
+    async def issue_access_token(claims: dict) -> str:
+        return await AuthService.generate_jwt(
+            login=claims['sub'],
+            expiration=timedelta(minutes=int(ACCESS_TOKEN_LIVE)),
+            user_id=claims['user_id'],
+        )
+
+    @staticmethod
+    async def rotate_refresh_token(session: db_dependency, refresh_token: str, claims: dict) -> str:
+        # jti keeps a token issued in the same second as the old one unique.
+        new_token = await AuthService.generate_jwt(
+            claims['sub'], timedelta(days=30), user_id=claims['user_id'],
+            token_type='refresh', jti=uuid4().hex,
+        )
+        # Only the token currently stored for the user can be rotated, so a
+        # refresh token that was already replaced cannot be used again.
+        user_id = UUID(claims['user_id'])
+        rotated = await UserRefreshTokens.update(
+            session,
+            {'token': new_token},
+            (UserRefreshTokens.user_id == user_id)
+            & (UserRefreshTokens.token == refresh_token),
+        )
+        if not rotated:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+
+        await BlackedRefreshTokens.create({
+            'token': refresh_token,
+            'user_id': user_id,
+            'expires_at': datetime.fromtimestamp(claims['exp'], UTC).replace(tzinfo=None),
+        },
+        session,
+        ignore_conflicts=True)
+
+        async def forget_rotated_token():
+            refresh_blacklist.add(refresh_token)
+            forget_token(refresh_token)
+
+        # Only once committed: a rolled back rotation leaves the old token
+        # valid, so this process must keep accepting it.
+        on_commit(session, forget_rotated_token)
+        return new_token
+
+    @staticmethod
+    async def refresh_tokens(session: db_dependency, refresh_token: str | None, rotate: bool = False) -> dict:
+        claims = await AuthService.get_refresh_claims(session, refresh_token)
+        if rotate:
+            # The conditional update already checks the stored token.
+            refresh_token = await AuthService.rotate_refresh_token(session, refresh_token, claims)
+        else:
+            await AuthService.ensure_current_refresh_token(session, refresh_token, claims)
+        access_token = await AuthService.issue_access_token(claims)
+
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+        }
+
     @staticmethod
     async def get_current_user(
         response: Response,
@@ -77,27 +191,14 @@ class AuthService:
         if not auth_token and not refresh_token:
             raise HTTPException(status_code=401, detail="Not authenticated")
 
-        if (not await AuthService.validate_jwt_token(session, token=auth_token)
-            and not await AuthService.validate_jwt_token(session, refresh_token)):
-            raise HTTPException(status_code=401, detail="Not authenticated")
-
         try:
-            if not auth_token and await AuthService.validate_jwt_token(session, refresh_token):
-                auth_token = await AuthService.generate_jwt(
-                    login=jwt.decode(refresh_token, SECRET_KEY, "HS256")['sub'],
-                    expiration=timedelta(minutes=int(ACCESS_TOKEN_LIVE)),
-                    user_id=jwt.decode(refresh_token, SECRET_KEY, "HS256")['user_id'],
-                )
-                response.set_cookie(
-                    key="auth_token",
-                    value=auth_token,
-                    httponly=False,
-                    secure=False,
-                    samesite="lax",
-                    max_age=int(ACCESS_TOKEN_LIVE) * 60,
-                )
-            user_credentials = jwt.decode(auth_token, SECRET_KEY, "HS256")
-            return await UserService.get_user_by_email(user_credentials['sub'], session=session)
+            if not await AuthService.validate_jwt_token(session, token=auth_token):
+                refresh_claims = await AuthService.get_refresh_claims(session, refresh_token)
+                await AuthService.ensure_current_refresh_token(session, refresh_token, refresh_claims)
+                auth_token = await AuthService.issue_access_token(refresh_claims)
+                AuthService.set_token_cookies(response, auth_token)
+            user_credentials = decode_token(auth_token)
+            return await UserService.get_authenticated_user(user_credentials, session=session)
 
         except JWTError as e:
             return {"status": "Error in token processing", "error": e}
@@ -1 +1,104 @@
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
 
+from jose import JWTError, jwk, jwt
+
+from config import (
+    JWT_ACCEPT_HS256,
+    JWT_ACTIVE_KID,
+    JWT_KEYS_DIR,
+    SECRET_KEY,
+    TOKEN_CACHE_SECONDS,
+    TOKEN_CACHE_SIZE,
+)
+from src.cache import TTLCache
+
+SIGNING_ALGORITHM = "RS256"
+LEGACY_ALGORITHM = "HS256"
+
+claims_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_SECONDS)
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    private_pem: str
+    public_jwk: dict
+
+
+class KeySet:
+
+    def __init__(self, keys: list[SigningKey], active_kid: str | None = None):
+        self.keys = {key.kid: key for key in keys}
+        if active_kid is not None and active_kid not in self.keys:
+            raise ValueError(f"No signing key with kid '{active_kid}'")
+        self.active = self.keys[active_kid] if active_kid else None
+        # Public keys only change on restart, so the document is built once.
+        self.jwks = {"keys": [key.public_jwk for key in self.keys.values()]}
+
+    @classmethod
+    def from_directory(cls, directory: str | None, active_kid: str | None = None) -> "KeySet":
+        # Every <kid>.pem in the directory is published; retired keys stay
+        # there until the tokens they signed have expired.
+        keys = []
+        for path in sorted(Path(directory).glob("*.pem")) if directory else ():
+            private_pem = path.read_text()
+            public_jwk = jwk.construct(private_pem, SIGNING_ALGORITHM).public_key().to_dict()
+            keys.append(SigningKey(
+                kid=path.stem,
+                private_pem=private_pem,
+                public_jwk={**public_jwk, "kid": path.stem, "use": "sig"},
+            ))
+        return cls(keys, active_kid)
+
+    def verification_key(self, kid: str | None) -> dict:
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown signing key '{kid}'")
+        return key.public_jwk
+
+
+key_set = KeySet.from_directory(JWT_KEYS_DIR, JWT_ACTIVE_KID)
+
+
+def encode_token(claims: dict) -> str:
+    # Without configured keys tokens stay HS256 with SECRET_KEY.
+    if key_set.active is None:
+        return jwt.encode(claims, SECRET_KEY, LEGACY_ALGORITHM)
+    return jwt.encode(
+        claims,
+        key_set.active.private_pem,
+        SIGNING_ALGORITHM,
+        headers={"kid": key_set.active.kid},
+    )
+
+
+def _verify(token: str) -> dict:
+    header = jwt.get_unverified_header(token)
+    # The algorithm is pinned per branch: the header only selects which
+    # key to try, never how a key is interpreted.
+    if header.get("alg") == SIGNING_ALGORITHM:
+        key = key_set.verification_key(header.get("kid"))
+        return jwt.decode(token, key, SIGNING_ALGORITHM)
+    if header.get("alg") == LEGACY_ALGORITHM and (key_set.active is None or JWT_ACCEPT_HS256):
+        return jwt.decode(token, SECRET_KEY, LEGACY_ALGORITHM)
+    raise JWTError(f"Unsupported token algorithm '{header.get('alg')}'")
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def decode_token(token: str) -> dict:
+    key = _digest(token)
+    claims = claims_cache.get(key)
+    if claims is None:
+        # Raises JWTError (including ExpiredSignatureError) like jwt.decode.
+        claims = _verify(token)
+        claims_cache.set(key, claims, expires_at=claims.get("exp"))
+    return dict(claims)
+
+
+def forget_token(token: str) -> None:
+    claims_cache.pop(_digest(token))
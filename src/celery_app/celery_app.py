@@ -6,6 +6,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 REDIS_URL = f"redis://:{os.getenv('REDIS_PASSWORD', '@1234ABC')}@redis:6379/0"
+BLACKLIST_PRUNE_INTERVAL = int(os.getenv("BLACKLIST_PRUNE_INTERVAL_SECONDS", "3600"))
 
 celery = Celery("src", broker=REDIS_URL, backend=REDIS_URL, include=["src.user.tasks"])
 
@@ -20,6 +21,12 @@ celery.conf.update(
     task_soft_time_limit=60,
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    beat_schedule={
+        "prune-blacklisted-tokens": {
+            "task": "src.user.tasks.prune_blacklisted_tokens",
+            "schedule": BLACKLIST_PRUNE_INTERVAL,
+        },
+    },
 )
 
 if os.getenv("ENVIRONMENT") == "development":
@@ -1,54 +1,190 @@
+from functools import wraps
+from itertools import cycle
+from logging import getLogger
 from typing import Annotated
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, Response
+from fastapi.routing import APIRoute
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
-from config import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
+from config import (
+    DB_CONNECTION_BUDGET,
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_REPLICA_URLS,
+    DB_RESERVED_CONNECTIONS,
+    DB_USER,
+    WORKERS,
+)
+from src.database.instrumentation import instrument_engine
+from src.database.pool import InstrumentedQueuePool, pool_limits, pool_stats
+from src.database.routing import is_pinned_to_primary, track_primary_writes
+
+logger = getLogger(__name__)
 
 db_url = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_async_engine(
-    db_url,
-    pool_size=20,
-    max_overflow=30,
-    pool_pre_ping=True,
-    pool_recycle=3600,
+pool_size, max_overflow = pool_limits(
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    connection_budget=DB_CONNECTION_BUDGET,
+    workers=WORKERS,
+    reserved=DB_RESERVED_CONNECTIONS,
 )
+engine_options = {
+    "poolclass": InstrumentedQueuePool,
+    "pool_size": pool_size,
+    "max_overflow": max_overflow,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+}
+engine = create_async_engine(db_url, **engine_options)
+instrument_engine(engine.sync_engine)
+track_primary_writes(engine.sync_engine)
 
 async_session = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+replica_engines = [create_async_engine(url, **engine_options) for url in DB_REPLICA_URLS]
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
 
-async def get_db() -> AsyncSession:
-    async with async_session() as session:
-        try:
-            yield session
-        except Exception as e:
-            print(f"Database error: {e}")
-            await session.rollback()
-            raise
-        finally:
-            await session.close()
+replica_sessions = [
+    async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
+_next_replica = cycle(replica_sessions)
+
+
+def engines_pool_stats() -> dict[str, dict]:
+    stats = {"primary": pool_stats(engine.pool)}
+    for number, replica_engine in enumerate(replica_engines):
+        stats[f"replica_{number}"] = pool_stats(replica_engine.pool)
+    return stats
+
+
+def read_session_factory(request: Request) -> async_sessionmaker:
+    if not replica_sessions or is_pinned_to_primary(request):
+        return async_session
+    return next(_next_replica)
+
+
+def on_commit(session: AsyncSession, callback) -> None:
+    session.info.setdefault("on_commit", []).append(callback)
 
 
 class DatabaseSession:
 
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    def __init__(self, session_factory: async_sessionmaker | None = None):
+        self.session_factory = session_factory
+        self.session: AsyncSession | None = None
+        self.finished = False
 
-    async def __aenter__(self):
+    async def __aenter__(self) -> AsyncSession:
+        self.session = (self.session_factory or async_session)()
         return self.session
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type:
-            await self.session.rollback()
-        else:
-            await self.session.commit()
+        try:
+            if self.finished:
+                return
+            # A handled 4xx still keeps what the request wrote before it,
+            # e.g. tokens blacklisted while rejecting the credentials.
+            if exc_type is None or _keeps_writes(exc_val):
+                await self.commit()
+            else:
+                logger.debug("Rolling back unit of work", exc_info=exc_val)
+                await self.session.rollback()
+        finally:
+            await self.session.close()
+
+    async def commit(self):
+        # Marked first: a failed commit is not retried on exit, where
+        # close() rolls it back instead.
+        self.finished = True
+        await self.session.commit()
+        await self._run_commit_callbacks()
+
+    async def _run_commit_callbacks(self):
+        for callback in self.session.info.pop("on_commit", []):
+            try:
+                await callback()
+            except Exception:
+                logger.exception("Post-commit callback failed")
+
+
+def _keeps_writes(exc: BaseException | None) -> bool:
+    return isinstance(exc, HTTPException) and exc.status_code < 500
 
 
 def with_db_session(func):
 
-    async def wrapper(*args, session: AsyncSession, **kwargs):
-        return await func(*args, session=session, **kwargs)
+    @wraps(func)
+    async def wrapper(*args, session: AsyncSession | None = None, **kwargs):
+        if session is not None:
+            return await func(*args, session=session, **kwargs)
+        async with DatabaseSession() as session:
+            return await func(*args, session=session, **kwargs)
 
     return wrapper
 
+
+def _request_unit_of_work(request: Request, unit_of_work: DatabaseSession) -> DatabaseSession:
+    request.state.units_of_work = [*getattr(request.state, "units_of_work", []), unit_of_work]
+    return unit_of_work
+
+
+async def get_db(request: Request) -> AsyncSession:
+    async with _request_unit_of_work(request, DatabaseSession()) as session:
+        yield session
+
+
+async def get_read_db(
+        request: Request,
+        primary_session: AsyncSession = Depends(get_db),
+) -> AsyncSession:
+    session_factory = read_session_factory(request)
+    if session_factory is async_session:
+        # get_db is cached per request, so this is the session the auth
+        # dependency already holds; a second one would make each request
+        # wait for another primary connection while keeping one.
+        yield primary_session
+        return
+
+    unit_of_work = DatabaseSession(session_factory)
+    async with _request_unit_of_work(request, unit_of_work) as session:
+        yield session
+
+
+async def commit_request(request: Request) -> None:
+    for unit_of_work in getattr(request.state, "units_of_work", []):
+        if not unit_of_work.finished:
+            await unit_of_work.commit()
+
+
+class UnitOfWorkRoute(APIRoute):
+    # Yield dependencies exit only after the response is sent (FastAPI
+    # 0.118+), too late for a failed commit to change the status code, so
+    # the request's sessions are committed here, before it goes out.
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def commit_before_response(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except Exception as exc:
+                if _keeps_writes(exc):
+                    await commit_request(request)
+                raise
+            await commit_request(request)
+            return response
+
+        return commit_before_response
+
 db_dependency = Annotated[AsyncSession, Depends(get_db)]
+read_db_dependency = Annotated[AsyncSession, Depends(get_read_db)]
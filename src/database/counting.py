@@ -0,0 +1,106 @@
+import asyncio
+import contextvars
+import json
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache import TTLCache
+from src.database.explain import Explain
+
+logger = getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RowCount:
+    total: int
+    exact: bool
+
+
+class RowCounter:
+
+    def __init__(
+            self,
+            exact_threshold: int = 10_000,
+            cache_seconds: int = 60,
+            cache_size: int = 1000,
+            max_refreshes: int = 2,
+    ):
+        self.exact_threshold = exact_threshold
+        self.cache_seconds = cache_seconds
+        self.max_refreshes = max_refreshes
+        # Keys include client-chosen filter values, so the cache is bounded.
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_seconds)
+        self._refreshing: dict[tuple, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(query: Any) -> tuple:
+        compiled = query.compile(dialect=postgresql.dialect())
+        return str(compiled), json.dumps(compiled.params, sort_keys=True, default=str)
+
+    async def count(self, session: AsyncSession, query: Any) -> RowCount:
+        query = query.order_by(None)
+
+        # Counting a capped subquery reads at most threshold + 1 rows,
+        # so small tables and selective filters still get an exact total.
+        capped = select(func.count()).select_from(
+            query.limit(self.exact_threshold + 1).subquery()
+        )
+        total = (await session.execute(capped)).scalar_one()
+        if total <= self.exact_threshold:
+            return RowCount(total, True)
+
+        key = self._key(query)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return RowCount(max(cached, total), False)
+
+        self._schedule_refresh(session, query, key)
+
+        estimate = await self.estimate(session, query)
+        return RowCount(max(estimate, total), False)
+
+    async def estimate(self, session: AsyncSession, query: Any) -> int:
+        froms = query.get_final_froms()
+        if query.whereclause is None and len(froms) == 1 and hasattr(froms[0], "name"):
+            result = await session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+                {"name": froms[0].name},
+            )
+            reltuples = result.scalar_one_or_none()
+            # -1 means the table has never been vacuumed or analyzed.
+            if reltuples is not None and reltuples >= 0:
+                return reltuples
+
+        result = await session.execute(Explain(query))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def _schedule_refresh(self, session: AsyncSession, query: Any, key: tuple) -> None:
+        # Each refresh is a full count: at most one per key and a few in
+        # total, so new filter values cannot pile up scans on the database.
+        if key in self._refreshing or len(self._refreshing) >= self.max_refreshes:
+            return
+        # A fresh context: the refresh outlives the request and must not
+        # inherit its query deadline, which an exact count would exceed.
+        task = asyncio.create_task(
+            self._refresh(session.bind, query, key), context=contextvars.Context()
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, bind: Any, query: Any, key: tuple) -> None:
+        try:
+            async with AsyncSession(bind) as session:
+                exact = select(func.count()).select_from(query.subquery())
+                total = (await session.execute(exact)).scalar_one()
+        except Exception:
+            logger.exception("Failed to refresh cached row count")
+            return
+        self._cache.set(key, total)
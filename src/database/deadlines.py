@@ -0,0 +1,81 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging import getLogger
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session
+
+from config import DB_LOCK_TIMEOUT_MS, DB_STATEMENT_TIMEOUT_MS
+
+logger = getLogger(__name__)
+
+QUERY_CANCELED = "57014"
+LOCK_NOT_AVAILABLE = "55P03"
+RETRY_AFTER_SECONDS = 1
+
+
+@dataclass(frozen=True)
+class QueryDeadline:
+    statement_ms: int
+    lock_ms: int
+
+
+_current_deadline: ContextVar[QueryDeadline | None] = ContextVar("query_deadline", default=None)
+
+
+def query_deadline(
+        statement_ms: int = DB_STATEMENT_TIMEOUT_MS,
+        lock_ms: int = DB_LOCK_TIMEOUT_MS,
+):
+    deadline = QueryDeadline(statement_ms, min(lock_ms, statement_ms))
+
+    async def set_deadline() -> None:
+        _current_deadline.set(deadline)
+
+    return set_deadline
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_deadline(session, transaction, connection):
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return
+
+    # set_config(..., true) is SET LOCAL: it ends with the transaction,
+    # so the connection goes back to the pool with server defaults.
+    connection.execute(
+        text(
+            "SELECT set_config('statement_timeout', :statement_ms, true), "
+            "set_config('lock_timeout', :lock_ms, true)"
+        ),
+        {"statement_ms": str(deadline.statement_ms), "lock_ms": str(deadline.lock_ms)},
+    )
+
+
+def _service_unavailable(detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": detail},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def database_error_handler(request: Request, exc: DBAPIError):
+    sqlstate = getattr(exc.orig, "sqlstate", None)
+    if sqlstate not in (QUERY_CANCELED, LOCK_NOT_AVAILABLE):
+        raise exc
+
+    logger.warning(
+        "%s %s exceeded its database deadline (sqlstate %s)",
+        request.method, request.url.path, sqlstate,
+    )
+    return _service_unavailable("Database deadline exceeded")
+
+
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    logger.warning("%s %s timed out waiting for a connection", request.method, request.url.path)
+    return _service_unavailable("Database is busy")
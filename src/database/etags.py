@@ -0,0 +1,18 @@
+import hashlib
+from datetime import datetime
+from uuid import UUID
+
+
+def make_etag(row_id: UUID, updated_at: datetime) -> str:
+    version = hashlib.sha256(f"{row_id}:{updated_at.isoformat()}".encode()).hexdigest()
+    return f'"{version[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored.
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
@@ -0,0 +1,101 @@
+import operator
+from dataclasses import dataclass
+from typing import Any, ClassVar
+
+from sqlalchemy import PrimaryKeyConstraint, Table, UniqueConstraint
+
+OPERATORS = {
+    "eq": operator.eq,
+    "ge": operator.ge,
+    "le": operator.le,
+    "contains": lambda column, value: column.contains(value),
+}
+
+# Operators that can only be served by an inverted (GIN) index.
+GIN_OPERATORS = {"contains"}
+
+
+@dataclass(frozen=True)
+class FilterField:
+    column: str
+    operator: str = "eq"
+    key: str | None = None
+
+
+def is_indexed(table: Table, column_name: str, operator_name: str = "eq") -> bool:
+    column = table.columns[column_name]
+    gin = operator_name in GIN_OPERATORS
+    if not gin and (column.primary_key or column.index or column.unique):
+        return True
+
+    leading_columns = [
+        next(iter(index.columns), None)
+        for index in table.indexes
+        if (index.dialect_options["postgresql"]["using"] == "gin") == gin
+    ]
+    if not gin:
+        leading_columns += [
+            next(iter(constraint.columns), None)
+            for constraint in table.constraints
+            if isinstance(constraint, PrimaryKeyConstraint | UniqueConstraint)
+        ]
+    return any(
+        leading is not None and leading.name == column_name
+        for leading in leading_columns
+    )
+
+
+class FilterSet:
+    model: ClassVar[Any]
+    fields: ClassVar[dict[str, FilterField]] = {}
+    sort_fields: ClassVar[tuple[str, ...]] = ("created_at",)
+    default_sort: ClassVar[str] = "-created_at"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        table = cls.model.__table__
+        for field in cls.fields.values():
+            if field.operator not in OPERATORS:
+                raise TypeError(f"{cls.__name__}: unknown operator {field.operator}")
+
+        columns = [(field.column, field.operator) for field in cls.fields.values()]
+        columns += [(column, "eq") for column in cls.sort_fields]
+        for column, operator_name in columns:
+            if not is_indexed(table, column, operator_name):
+                raise TypeError(
+                    f"{cls.__name__}: {table.name}.{column} has no index "
+                    f"and cannot be used for filtering or sorting"
+                )
+
+    def __init__(self, values: dict[str, Any] | None = None, sort: str | None = None):
+        values = values or {}
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise ValueError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+        self.values = {name: value for name, value in values.items() if value is not None}
+
+        sort = sort or self.default_sort
+        self.descending = sort.startswith("-")
+        self.sort_field = sort.lstrip("-")
+        if self.sort_field not in self.sort_fields:
+            raise ValueError(
+                f"Unsupported sort field: {self.sort_field}. "
+                f"Allowed: {', '.join(self.sort_fields)}"
+            )
+
+    def filter(self, query: Any) -> Any:
+        for name, value in self.values.items():
+            field = self.fields[name]
+            column = getattr(self.model, field.column)
+            if field.key:
+                # {"allergies": ["peanuts"]} matches documents whose
+                # allergies array includes "peanuts".
+                value = {field.key: value if isinstance(value, list) else [value]}
+            query = query.where(OPERATORS[field.operator](column, value))
+        return query
+
+    def sort(self, query: Any) -> Any:
+        keyset = (getattr(self.model, self.sort_field), self.model.id)
+        if self.descending:
+            return query.order_by(*(column.desc() for column in keyset))
+        return query.order_by(*keyset)
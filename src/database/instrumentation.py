@@ -0,0 +1,101 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging import getLogger
+from time import perf_counter
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    rows: int = 0
+    db_time: float = 0.0
+    executed: list[str] = field(default_factory=list)
+
+    @property
+    def db_time_ms(self) -> float:
+        return round(self.db_time * 1000, 2)
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info["query_started_at"].pop()
+    stats = _current_stats.get()
+    if stats is None:
+        return
+
+    stats.statements += 1
+    stats.rows += max(cursor.rowcount or 0, 0)
+    stats.db_time += perf_counter() - started_at
+    stats.executed.append(statement)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    with track_queries() as stats:
+        yield stats
+
+    if stats.statements > budget:
+        executed = "\n".join(
+            f"{number}. {statement}"
+            for number, statement in enumerate(stats.executed, start=1)
+        )
+        raise AssertionError(
+            f"Expected at most {budget} queries, {stats.statements} were executed:\n"
+            f"{executed}"
+        )
+
+
+async def query_stats_middleware(request: Request, call_next):
+    with track_queries() as stats:
+        response = await call_next(request)
+
+    response.headers["X-DB-Queries"] = str(stats.statements)
+    response.headers["X-DB-Rows"] = str(stats.rows)
+    response.headers["X-DB-Time-Ms"] = str(stats.db_time_ms)
+    logger.info(
+        "%s %s: %s queries, %s rows, %s ms in database",
+        request.method,
+        request.url.path,
+        stats.statements,
+        stats.rows,
+        stats.db_time_ms,
+    )
+    return response
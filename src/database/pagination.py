@@ -0,0 +1,56 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def clamp_page_size(limit: int | None) -> int:
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _load_value(value: Any, column: InstrumentedAttribute) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is UUID:
+        return UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_field: str, values: tuple[Any, ...]) -> str:
+    payload = json.dumps([sort_field, *(_dump_value(v) for v in values)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+        cursor: str,
+        sort_field: str,
+        columns: tuple[InstrumentedAttribute, ...],
+) -> tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        field, *values = json.loads(base64.urlsafe_b64decode(padded))
+        if field != sort_field or len(values) != len(columns):
+            raise ValueError
+        return tuple(
+            _load_value(value, column)
+            for value, column in zip(values, columns, strict=True)
+        )
+    except (ValueError, TypeError):
+        raise ValueError("Invalid pagination cursor") from None
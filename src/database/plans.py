@@ -0,0 +1,81 @@
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+@dataclass(frozen=True)
+class CapturedStatement:
+    statement: str
+    parameters: Any
+
+
+@dataclass(frozen=True)
+class SeqScan:
+    table: str
+    table_rows: int
+    statement: str
+
+
+@contextmanager
+def capture_statements(engine: Engine) -> Iterator[list[CapturedStatement]]:
+    captured: list[CapturedStatement] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(EXPLAINABLE):
+            captured.append(CapturedStatement(statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+def _plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from _plan_nodes(child)
+
+
+async def explain(connection: AsyncConnection, captured: CapturedStatement) -> dict:
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {captured.statement}", captured.parameters
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def find_seq_scans(
+        connection: AsyncConnection,
+        statements: list[CapturedStatement],
+        tables: set[str],
+        min_rows: int,
+) -> list[SeqScan]:
+    result = await connection.execute(
+        text("SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(:tables)"),
+        {"tables": list(tables)},
+    )
+    table_rows = dict(result.all())
+
+    scans = []
+    for captured in statements:
+        plan = await explain(connection, captured)
+        for node in _plan_nodes(plan):
+            table = node.get("Relation Name")
+            if (
+                node["Node Type"] == "Seq Scan"
+                and table in tables
+                and table_rows.get(table, 0) >= min_rows
+            ):
+                scans.append(SeqScan(table, table_rows[table], captured.statement))
+    return scans
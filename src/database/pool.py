@@ -0,0 +1,85 @@
+from bisect import bisect_left
+from logging import getLogger
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = getLogger(__name__)
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class PoolMetrics:
+
+    def __init__(self):
+        self.wait_counts = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_sum = 0.0
+        self.checkouts = 0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_counts[bisect_left(WAIT_BUCKETS, seconds)] += 1
+        self.wait_sum += seconds
+        self.checkouts += 1
+
+    def histogram(self) -> dict[str, int]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip((*WAIT_BUCKETS, "+Inf"), self.wait_counts, strict=True):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return buckets
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started_at = perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            logger.warning("Timed out waiting for a pooled connection: %s", self.status())
+            raise
+        self.metrics.observe_wait(perf_counter() - started_at)
+        return connection
+
+
+def pool_limits(
+        pool_size: int,
+        max_overflow: int,
+        connection_budget: int = 0,
+        workers: int = 1,
+        reserved: int = 0,
+) -> tuple[int, int]:
+    if connection_budget <= 0:
+        return pool_size, max_overflow
+
+    per_worker = max(1, (connection_budget - reserved) // max(workers, 1))
+    pool_size = max(1, per_worker // 2)
+    return pool_size, per_worker - pool_size
+
+
+def pool_stats(pool: Any) -> dict[str, Any]:
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(
+            checkouts=metrics.checkouts,
+            timeouts=metrics.timeouts,
+            wait_seconds_sum=round(metrics.wait_sum, 6),
+            wait_seconds_buckets=metrics.histogram(),
+        )
+    return stats
@@ -0,0 +1,52 @@
+from contextvars import ContextVar
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import DB_REPLICA_STICKINESS_SECONDS, DB_REPLICA_URLS
+
+PRIMARY_PIN_COOKIE = "db_primary_pin"
+
+
+class _WriteMarker:
+    wrote: bool = False
+
+
+_write_marker: ContextVar[_WriteMarker | None] = ContextVar("write_marker", default=None)
+
+
+def _mark_writes(conn, cursor, statement, parameters, context, executemany):
+    marker = _write_marker.get()
+    if marker is None or context is None:
+        return
+    if context.isinsert or context.isupdate or context.isdelete:
+        marker.wrote = True
+
+
+def track_primary_writes(engine: Engine) -> None:
+    if not event.contains(engine, "after_cursor_execute", _mark_writes):
+        event.listen(engine, "after_cursor_execute", _mark_writes)
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    return PRIMARY_PIN_COOKIE in request.cookies
+
+
+async def replica_stickiness_middleware(request: Request, call_next):
+    marker = _WriteMarker()
+    token = _write_marker.set(marker)
+    try:
+        response = await call_next(request)
+    finally:
+        _write_marker.reset(token)
+
+    if marker.wrote and DB_REPLICA_URLS:
+        response.set_cookie(
+            key=PRIMARY_PIN_COOKIE,
+            value="1",
+            max_age=DB_REPLICA_STICKINESS_SECONDS,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
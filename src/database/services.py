@@ -1,9 +1,15 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Iterable
+from contextlib import suppress
 from datetime import UTC, datetime
 from typing import Any, TypeVar
 from uuid import UUID, uuid4
 
 from pydantic import BaseModel
-from sqlalchemy import DateTime, MetaData, Uuid, delete, select, update
+from sqlalchemy import JSON, DateTime, MetaData, Uuid, delete, select, tuple_, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import (
     DeclarativeBase,
@@ -13,6 +19,8 @@ from sqlalchemy.orm import (
     selectinload,
 )
 
+from src.database.pagination import clamp_page_size, decode_cursor, encode_cursor
+
 T = TypeVar("T")
 
 
@@ -73,6 +81,70 @@ class CoreModel(Base):
         result = await session.execute(query)
         return result.scalars().all()
 
+    @classmethod
+    async def stream(
+            cls,
+            session: AsyncSession,
+            prefetch: tuple[str, ...] | None = None,
+            filters: Any | None = None,
+            options: list[Any] | None = None,
+            sort_by_creation: bool | None = None,
+            batch_size: int = 500,
+    ) -> AsyncIterator[list[Any]]:
+        query = cls._get_query(prefetch, options, filters)
+        if sort_by_creation:
+            query = query.order_by(cls.created_at.desc(), cls.id.desc())
+
+        result = await session.stream_scalars(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for batch in result.partitions():
+            yield batch
+
+    @classmethod
+    async def paginate(
+            cls,
+            session: AsyncSession,
+            limit: int | None = None,
+            cursor: str | None = None,
+            prefetch: tuple[str, ...] | None = None,
+            filters: Any | None = None,
+            options: list[Any] | None = None,
+            sort_field: str = "created_at",
+            descending: bool = True,
+    ) -> tuple[list[Any], str | None]:
+        limit = clamp_page_size(limit)
+
+        query = cls._get_query(prefetch, options)
+        if filters:
+            query = filters.filter(query)
+            sort_field, descending = filters.sort_field, filters.descending
+        keyset = (getattr(cls, sort_field), cls.id)
+
+        if cursor:
+            after = decode_cursor(cursor, sort_field, keyset)
+            if descending:
+                query = query.where(tuple_(*keyset) < after)
+            else:
+                query = query.where(tuple_(*keyset) > after)
+
+        if descending:
+            query = query.order_by(*(column.desc() for column in keyset))
+        else:
+            query = query.order_by(*keyset)
+
+        result = await session.execute(query.limit(limit + 1))
+        items = list(result.scalars().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor(
+                sort_field, tuple(getattr(last, column.key) for column in keyset)
+            )
+        return items, next_cursor
+
     @classmethod
     async def get_by_field(
             cls,
@@ -97,27 +169,220 @@ class CoreModel(Base):
             query = query.options(*options)
 
         result = await session.execute(query)
-        obj = result.scalar_one_or_none()
-        if obj:
-            await session.refresh(obj)
-        return obj
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def get_version_by_field(
+            cls,
+            session: AsyncSession,
+            field_name: str,
+            value: Any,
+    ) -> tuple[UUID, datetime] | None:
+        field = getattr(cls, field_name)
+        if not field:
+            raise AttributeError(f"Field {field_name} is not defined")
+
+        result = await session.execute(
+            select(cls.id, cls.updated_at).where(field == value)
+        )
+        row = result.one_or_none()
+        return tuple(row) if row else None
+
+    @classmethod
+    def _columns_for(cls, schema: type[BaseModel]) -> list[Any]:
+        columns = cls.__table__.columns
+        return [columns[name] for name in schema.model_fields if name in columns]
+
+    @classmethod
+    async def get_projection_by_field(
+            cls,
+            session: AsyncSession,
+            field_name: str,
+            value: Any,
+            schema: type[BaseModel],
+    ) -> dict[str, Any] | None:
+        field = getattr(cls, field_name)
+        if not field:
+            raise AttributeError(f"Field {field_name} is not defined")
+
+        query = select(*cls._columns_for(schema)).where(field == value)
+        result = await session.execute(query)
+        row = result.mappings().one_or_none()
+        return dict(row) if row else None
 
     @classmethod
     async def create(
             cls,
             data: T | BaseModel | dict,
             session: AsyncSession,
-    ) -> T:
-        if not isinstance(data, cls):
-            if isinstance(data, BaseModel):
-                data = data.model_dump(exclude_unset=True)
-            if isinstance(data, dict):
-                data = cls(**data)
+            *,
+            ignore_conflicts: bool = False,
+    ) -> T | None:
+        if isinstance(data, cls):
+            session.add(data)
+            await session.flush()
+            return data
+
+        if isinstance(data, BaseModel):
+            data = data.model_dump(exclude_unset=True)
+
+        stmt = insert(cls).values(data).returning(cls)
+        if ignore_conflicts:
+            stmt = stmt.on_conflict_do_nothing()
+
+        result = await session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    def _prepare_rows(cls, records: list[BaseModel | dict]) -> list[dict[str, Any]]:
+        rows = []
+        for record in records:
+            if isinstance(record, BaseModel):
+                record = record.model_dump(exclude_unset=True)
+            rows.append({"id": uuid4(), **record})
+        return rows
+
+    @classmethod
+    async def bulk_create(
+            cls,
+            session: AsyncSession,
+            records: list[BaseModel | dict],
+            *,
+            ignore_conflicts: bool = True,
+    ) -> tuple[list[Any], list[int]]:
+        rows = cls._prepare_rows(records)
+        if not rows:
+            return [], []
+
+        stmt = insert(cls).returning(cls)
+        if ignore_conflicts:
+            stmt = stmt.on_conflict_do_nothing()
+
+        result = await session.execute(stmt, rows)
+        created = result.scalars().all()
+
+        positions = {row["id"]: index for index, row in enumerate(rows)}
+        created = sorted(created, key=lambda obj: positions[obj.id])
+        created_ids = {obj.id for obj in created}
+        rejected = [
+            index for index, row in enumerate(rows) if row["id"] not in created_ids
+        ]
+        return created, rejected
+
+    @classmethod
+    async def bulk_upsert(
+            cls,
+            session: AsyncSession,
+            records: list[BaseModel | dict],
+            conflict_fields: list[str],
+            update_fields: list[str] | None = None,
+    ) -> tuple[list[Any], list[int]]:
+        rows = cls._prepare_rows(records)
+        if not rows:
+            return [], []
+
+        # Postgres refuses to update the same row twice in one statement,
+        # so only the last record for each conflict key is sent.
+        latest: dict[tuple, int] = {}
+        for index, row in enumerate(rows):
+            latest[tuple(row[field] for field in conflict_fields)] = index
+        accepted = sorted(latest.values())
+        rejected = sorted(set(range(len(rows))) - set(accepted))
+
+        if update_fields is None:
+            update_fields = [
+                key for key in rows[0]
+                if key not in conflict_fields and key not in ("id", "created_at")
+            ]
+
+        stmt = insert(cls)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_fields,
+            set_={
+                field: stmt.excluded[field]
+                for field in (*update_fields, "updated_at")
+            },
+        ).returning(cls).execution_options(populate_existing=True)
+
+        result = await session.execute(stmt, [rows[index] for index in accepted])
+        return result.scalars().all(), rejected
 
-        session.add(data)
-        await session.commit()
-        await session.refresh(data)
-        return data
+    @classmethod
+    def _copy_row(cls, record: BaseModel | dict) -> tuple:
+        if isinstance(record, BaseModel):
+            record = record.model_dump(exclude_unset=True)
+
+        row = []
+        for column in cls.__table__.columns:
+            if column.key in record:
+                value = record[column.key]
+            elif column.default is not None and column.default.is_callable:
+                value = column.default.arg(None)
+            elif column.default is not None and column.default.is_scalar:
+                value = column.default.arg
+            else:
+                value = None
+
+            if value is not None and isinstance(column.type, JSON):
+                value = json.dumps(value)
+            row.append(value)
+        return tuple(row)
+
+    @classmethod
+    async def copy_in(
+            cls,
+            session: AsyncSession,
+            records: Iterable[BaseModel | dict],
+    ) -> int:
+        table = cls.__table__
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        status = await raw_connection.driver_connection.copy_records_to_table(
+            table.name,
+            records=(cls._copy_row(record) for record in records),
+            columns=[column.name for column in table.columns],
+            schema_name=table.schema,
+        )
+        return int(status.split()[-1])
+
+    @classmethod
+    async def copy_out(
+            cls,
+            session: AsyncSession,
+            columns: list[Any] | None = None,
+            buffer_chunks: int = 16,
+    ) -> AsyncIterator[bytes]:
+        query = select(*(columns or cls.__table__.columns))
+        sql = str(query.compile(dialect=postgresql.dialect()))
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=buffer_chunks)
+
+        async def copy() -> None:
+            try:
+                await raw_connection.driver_connection.copy_from_query(
+                    sql, output=chunks.put, format="csv", header=True
+                )
+            except Exception:
+                await chunks.put(None)
+                raise
+            await chunks.put(None)
+
+        task = asyncio.create_task(copy())
+        try:
+            while (chunk := await chunks.get()) is not None:
+                yield bytes(chunk)
+            await task
+        finally:
+            if not task.done():
+                # The client went away mid-copy: the protocol state of this
+                # connection is unknown, so it must not go back to the pool.
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+                await connection.invalidate()
 
     @classmethod
     async def update(
@@ -138,7 +403,6 @@ class CoreModel(Base):
         stmt = stmt.returning(cls)
 
         result = await session.execute(stmt)
-        await session.commit()
         data = result.scalars().all()
 
         if len(data) > 1:
@@ -168,7 +432,6 @@ class CoreModel(Base):
             stmt = stmt.returning(cls)
 
         result = await session.execute(stmt)
-        await session.commit()
 
         if returning:
             return result.scalars().all()
@@ -91,11 +91,11 @@ class AuthenticatedUserApiLoadTest(HttpUser):
                              name="GET /user/get/all") as response:
             if response.status_code == 200:
                 try:
-                    users = response.json()
-                    if isinstance(users, list):
+                    page = response.json()
+                    if isinstance(page.get("items"), list):
                         response.success()
                     else:
-                        response.failure("Response is not a list")
+                        response.failure("Response has no items list")
                 except json.JSONDecodeError:
                     response.failure("Invalid JSON response")
             elif self.check_authentication_and_retry(response):
@@ -300,7 +300,7 @@ class AuthenticatedUserApiLoadTest(HttpUser):
                               name="POST /user/create-batch") as response:
             if response.status_code == 200:
                 try:
-                    created_users = response.json()
+                    created_users = response.json()["created"]
                     for user in created_users:
                         self.created_users.append(user.get("id"))
                     response.success()
@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+import uuid
+
+from faker import Faker
+
+from src.auth.passwords import pwd_context
+from src.database.connection import with_db_session
+from src.user.models import User
+
+fake = Faker()
+
+SEED_PASSWORD = "TestPassword123!"
+
+
+def generate_users(count: int, password_hash: str):
+    for _ in range(count):
+        suffix = uuid.uuid4().hex[:12]
+        yield {
+            "username": f"seed_{suffix}",
+            "name": fake.first_name(),
+            "surname": fake.last_name(),
+            "email": f"seed_{suffix}@example.com",
+            "password_hash": password_hash,
+            "user_preferences": {},
+        }
+
+
+@with_db_session
+async def seed_users(count: int, session=None) -> int:
+    # Hashing once keeps seeding I/O bound; every seeded user shares SEED_PASSWORD.
+    password_hash = pwd_context.hash(SEED_PASSWORD)
+    return await User.copy_in(session, generate_users(count, password_hash))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the users table via COPY")
+    parser.add_argument("--count", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(f"Seeded {asyncio.run(seed_users(args.count))} users")
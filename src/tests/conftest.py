@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from src.database.instrumentation import instrument_engine
+from src.database.services import Base
+
+TEST_DB_HOST = os.getenv("TEST_DB_HOST")
+
+requires_db = pytest.mark.skipif(not TEST_DB_HOST, reason="TEST_DB_HOST is not configured")
+
+
+def database_url() -> str:
+    return (
+        f"postgresql+asyncpg://{os.getenv('TEST_DB_USER')}:{os.getenv('TEST_DB_PASSWORD')}"
+        f"@{TEST_DB_HOST}:{os.getenv('TEST_DB_PORT')}/{os.getenv('TEST_DB_NAME')}"
+    )
+
+
+def reset_tables(engine: AsyncEngine) -> None:
+    async def recreate():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(recreate())
+
+
+@pytest.fixture(scope="class")
+def test_engine():
+    if not TEST_DB_HOST:
+        pytest.skip("TEST_DB_HOST is not configured")
+
+    # NullPool: тести запускають кожен сценарій у власному циклі подій,
+    # тож з'єднання не можуть переходити між ними.
+    engine = create_async_engine(database_url(), poolclass=NullPool)
+    instrument_engine(engine.sync_engine)
+    reset_tables(engine)
+    return engine
+
+
+@pytest.fixture(scope="class")
+def app_client(test_engine):
+    import src.database.connection as connection
+    from src.api import app
+
+    session_factory = async_sessionmaker(bind=test_engine, expire_on_commit=False)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(connection, "async_session", session_factory)
+        with TestClient(app) as client:
+            yield client
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.blacklist import BloomFilter, RefreshTokenBlacklist
+from src.database.services import utcnow_naive
+from src.tests.conftest import requires_db, reset_tables
+from src.user.models import BlackedRefreshTokens, User
+
+
+class TestBloomFilter:
+    """Тести для фільтра Блума чорного списку"""
+
+    def test_no_false_negatives(self):
+        """Кожен доданий елемент знаходиться у фільтрі"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        tokens = [f"token_{i}" for i in range(1000)]
+        for token in tokens:
+            bloom.add(token)
+
+        assert all(token in bloom for token in tokens)
+
+    def test_false_positive_rate_is_bounded(self):
+        """Частка хибних спрацювань близька до заданої"""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"token_{i}")
+
+        false_positives = sum(f"other_{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+    def test_repeated_items_counted_once(self):
+        """Повторно додані елементи не збільшують лічильник"""
+        bloom = BloomFilter(capacity=100, error_rate=0.01)
+        for _ in range(3):
+            for i in range(10):
+                bloom.add(f"token_{i}")
+
+        assert bloom.count == 10
+
+    def test_unloaded_blacklist_defers_to_database(self):
+        """До першого завантаження кожен токен перевіряється в базі"""
+        blacklist = RefreshTokenBlacklist(capacity=10, error_rate=0.01)
+
+        assert blacklist.might_contain("token")
+
+
+@requires_db
+class TestBlacklistPruning:
+    """Тести для очищення прострочених токенів з чорного списку"""
+
+    @pytest.fixture
+    def engine(self, test_engine):
+        # Кожен тест змінює таблицю, тож починає з чистої.
+        reset_tables(test_engine)
+
+        async def seed():
+
+            now = utcnow_naive()
+            async with AsyncSession(test_engine) as session:
+                user = await User.create({
+                    "username": "blacklist",
+                    "name": "Black",
+                    "surname": "List",
+                    "email": "blacklist@example.com",
+                    "password_hash": "hash",
+                }, session)
+                await BlackedRefreshTokens.copy_in(session, (
+                    {
+                        "user_id": user.id,
+                        "token": f"token_{i}",
+                        "expires_at": now + timedelta(hours=1 if i % 4 == 0 else -1),
+                    }
+                    for i in range(100)
+                ))
+                await session.commit()
+
+        asyncio.run(seed())
+        return test_engine
+
+    def test_prunes_only_expired(self, engine):
+        """Видаляються лише прострочені записи, пакетами"""
+        async def prune():
+            async with AsyncSession(engine) as session:
+                first = await BlackedRefreshTokens.prune_expired(session, batch_size=50)
+                second = await BlackedRefreshTokens.prune_expired(session, batch_size=50)
+                remaining = await session.scalar(
+                    select(func.count()).select_from(BlackedRefreshTokens)
+                )
+                await session.commit()
+            return first, second, remaining
+
+        assert asyncio.run(prune()) == (50, 25, 25)
+
+    def test_filter_follows_table(self, engine):
+        """Фільтр завантажується з таблиці й отримує нові записи при синхронізації"""
+        blacklist = RefreshTokenBlacklist(capacity=1000, error_rate=0.001)
+
+        async def scenario():
+            async with AsyncSession(engine) as session:
+                await blacklist.rebuild(session)
+                loaded = blacklist.might_contain("token_1")
+                missing = blacklist.might_contain("token_new")
+
+                user_id = await session.scalar(select(User.id))
+                await BlackedRefreshTokens.create({
+                    "user_id": user_id,
+                    "token": "token_new",
+                    "expires_at": utcnow_naive() + timedelta(hours=1),
+                }, session)
+                await session.commit()
+
+                await blacklist.sync(session)
+                await blacklist.sync(session)
+                assert blacklist._filter.count == 101
+                found = await blacklist.contains(session, "token_new")
+                absent = await blacklist.contains(session, "token_missing")
+            return loaded, missing, found, absent
+
+        assert asyncio.run(scenario()) == (True, False, True, False)
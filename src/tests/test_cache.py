@@ -0,0 +1,80 @@
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from jose import JWTError
+
+from src.auth import tokens_processing
+from src.auth.services import AuthService
+from src.cache import TTLCache
+
+
+class TestTTLCache:
+    """Тести для обмеженого LRU-кешу з терміном дії"""
+
+    def test_evicts_least_recently_used(self):
+        """При переповненні витісняється найдавніше використаний запис"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_entry_expires_no_later_than_given_time(self):
+        """Запис не живе довше за переданий термін дії"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("expired", 1, expires_at=time.time() - 1)
+        cache.set("alive", 2, expires_at=time.time() + 600)
+
+        assert cache.get("expired") is None
+        assert cache.get("alive") == 2
+        assert len(cache) == 1
+
+
+class TestDecodeToken:
+    """Тести для кешу перевірених claims токенів"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        tokens_processing.claims_cache.clear()
+        yield
+        tokens_processing.claims_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_token_verified_once(self):
+        """Підпис токена перевіряється лише один раз"""
+        token = await AuthService.generate_jwt("user@example.com", timedelta(minutes=5), user_id="1")
+
+        with patch.object(tokens_processing.jwt, "decode", wraps=tokens_processing.jwt.decode) as decode:
+            first = tokens_processing.decode_token(token)
+            second = tokens_processing.decode_token(token)
+
+        assert decode.call_count == 1
+        assert first == second
+        assert first["sub"] == "user@example.com"
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_not_cached(self):
+        """Недійсний або прострочений токен не потрапляє в кеш"""
+        expired = await AuthService.generate_jwt("user@example.com", timedelta(seconds=-1), user_id="1")
+
+        with pytest.raises(JWTError):
+            tokens_processing.decode_token(expired)
+        with pytest.raises(JWTError):
+            tokens_processing.decode_token("not-a-token")
+        assert len(tokens_processing.claims_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_forget_token(self):
+        """Відкликаний токен видаляється з кешу"""
+        token = await AuthService.generate_jwt("user@example.com", timedelta(minutes=5), user_id="1")
+        tokens_processing.decode_token(token)
+
+        tokens_processing.forget_token(token)
+
+        assert len(tokens_processing.claims_cache) == 0
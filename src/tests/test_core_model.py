@@ -0,0 +1,315 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.instrumentation import (
+    assert_max_queries,
+    track_queries,
+)
+from src.tests.conftest import requires_db, reset_tables
+from src.user.models import User
+from src.user.schemas import UserResponse
+from src.user.services import UserService
+
+
+def _record(i: int, name: str = "Core") -> dict:
+    return {
+        "username": f"core_{i}",
+        "name": name,
+        "surname": "User",
+        "email": f"core_{i}@example.com",
+        "password_hash": "hash",
+    }
+
+
+def _seed(engine, rows: int):
+    # Тести класів змінюють таблицю, тож кожен починає з чистої.
+    reset_tables(engine)
+
+    async def seed():
+        async with AsyncSession(engine) as session:
+            session.add_all(User(**_record(i)) for i in range(rows))
+            await session.commit()
+
+    asyncio.run(seed())
+    return engine
+
+
+@requires_db
+class TestBulkUpsert:
+    """Тести для пакетного upsert"""
+
+    @pytest.fixture
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=3)
+
+    def test_existing_rows_updated(self, engine):
+        """Наявні рядки оновлюються, нові — створюються, і всі повертаються"""
+        async def upsert():
+            async with AsyncSession(engine) as session:
+                before = {
+                    user.email: user.id
+                    for user in (await session.execute(select(User))).scalars()
+                }
+                rows, rejected = await User.bulk_upsert(
+                    session,
+                    [_record(0, "Updated"), _record(1, "Updated"), _record(5, "New")],
+                    conflict_fields=["email"],
+                    update_fields=["name"],
+                )
+                returned = {user.email: (user.id, user.name) for user in rows}
+                await session.commit()
+
+            async with AsyncSession(engine) as session:
+                stored = (await session.execute(select(User).order_by(User.username))).scalars()
+                return before, returned, rejected, [(user.email, user.name) for user in stored]
+
+        before, returned, rejected, stored = asyncio.run(upsert())
+
+        assert rejected == []
+        # Оновлені рядки зберігають свій первинний ключ.
+        assert returned == {
+            "core_0@example.com": (before["core_0@example.com"], "Updated"),
+            "core_1@example.com": (before["core_1@example.com"], "Updated"),
+            "core_5@example.com": (returned["core_5@example.com"][0], "New"),
+        }
+        assert stored == [
+            ("core_0@example.com", "Updated"),
+            ("core_1@example.com", "Updated"),
+            ("core_2@example.com", "Core"),
+            ("core_5@example.com", "New"),
+        ]
+
+    def test_duplicate_keys_rejected(self, engine):
+        """З повторюваних ключів у пакеті застосовується останній запис"""
+        async def upsert():
+            async with AsyncSession(engine) as session:
+                rows, rejected = await User.bulk_upsert(
+                    session,
+                    [_record(0, "First"), _record(0, "Last")],
+                    conflict_fields=["email"],
+                    update_fields=["name"],
+                )
+                return [user.name for user in rows], rejected
+
+        names, rejected = asyncio.run(upsert())
+
+        assert rejected == [0]
+        assert names == ["Last"]
+
+
+@requires_db
+class TestStream:
+    """Тести для потокового читання рядків пакетами"""
+
+    @pytest.fixture(scope="class")
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=5)
+
+    def test_rows_streamed_in_batches(self, engine):
+        """Рядки читаються пакетами заданого розміру від найновіших"""
+        async def stream():
+            async with AsyncSession(engine) as session:
+                expected = (await session.execute(
+                    select(User.id).order_by(User.created_at.desc(), User.id.desc())
+                )).scalars().all()
+                batches = [
+                    [user.id for user in batch]
+                    async for batch in User.stream(session, sort_by_creation=True, batch_size=2)
+                ]
+                return expected, batches
+
+        expected, batches = asyncio.run(stream())
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [user_id for batch in batches for user_id in batch] == expected
+
+    def test_ndjson_omits_password_hash(self, engine):
+        """Кожен користувач — окремий рядок JSON без хешу пароля"""
+        async def stream():
+            async with AsyncSession(engine) as session:
+                return [
+                    chunk
+                    async for chunk in UserService.stream_users_ndjson(session, batch_size=2)
+                ]
+
+        chunks = asyncio.run(stream())
+        users = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+        assert len(chunks) == 3
+        assert sorted(user["email"] for user in users) == [
+            f"core_{i}@example.com" for i in range(5)
+        ]
+        assert all("password_hash" not in user for user in users)
+
+
+@requires_db
+class TestSingleStatementWrites:
+    """Тести для створення та читання одним запитом через RETURNING"""
+
+    @pytest.fixture
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=1)
+
+    def test_create_returns_row_in_one_query(self, engine):
+        """create повертає рядок зі значеннями за замовчуванням одним запитом"""
+        async def create():
+            async with AsyncSession(engine) as session:
+                with assert_max_queries(1):
+                    user = await User.create(_record(1), session)
+                return user.id, user.username, user.created_at
+
+        user_id, username, created_at = asyncio.run(create())
+
+        assert user_id is not None
+        assert username == "core_1"
+        assert created_at is not None
+
+    def test_conflicting_create_ignored(self, engine):
+        """При ignore_conflicts конфлікт повертає None без помилки"""
+        async def create():
+            async with AsyncSession(engine) as session:
+                with assert_max_queries(1):
+                    return await User.create(_record(0), session, ignore_conflicts=True)
+
+        assert asyncio.run(create()) is None
+
+    def test_get_by_field_in_one_query(self, engine):
+        """get_by_field не перечитує знайдений рядок окремим запитом"""
+        async def get():
+            async with AsyncSession(engine) as session:
+                with assert_max_queries(1):
+                    user = await User.get_by_field(session, "email", "core_0@example.com")
+                return user.username
+
+        assert asyncio.run(get()) == "core_0"
+
+    def test_update_returns_changed_row(self, engine):
+        """update змінює рядок і повертає його одним запитом"""
+        async def update():
+            async with AsyncSession(engine) as session:
+                with assert_max_queries(1):
+                    user = await User.update(
+                        session, {"name": "Renamed"}, User.email == "core_0@example.com"
+                    )
+                return user.name
+
+        assert asyncio.run(update()) == "Renamed"
+
+
+@requires_db
+class TestProjections:
+    """Тести для читання лише потрібних стовпців"""
+
+    @pytest.fixture(scope="class")
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=1)
+
+    def test_profile_selects_schema_columns(self, engine):
+        """Профіль містить лише поля схеми відповіді, без хешу пароля"""
+        async def profile():
+            async with AsyncSession(engine) as session:
+                with track_queries() as stats:
+                    row = await UserService.get_user_profile("email", "core_0@example.com", session)
+                return row, stats.executed
+
+        row, executed = asyncio.run(profile())
+
+        assert set(row) == set(UserResponse.model_fields) & set(User.__table__.columns.keys())
+        assert row["username"] == "core_0"
+        assert "password_hash" not in executed[0]
+        assert UserResponse.model_validate(row).email == "core_0@example.com"
+
+    def test_missing_row_returns_none(self, engine):
+        """Для відсутнього рядка проєкція повертає None"""
+        async def profile():
+            async with AsyncSession(engine) as session:
+                return await User.get_projection_by_field(
+                    session, "email", "missing@example.com", UserResponse
+                )
+
+        assert asyncio.run(profile()) is None
+
+
+@requires_db
+class TestCopyIn:
+    """Тести для масового завантаження рядків через COPY"""
+
+    @pytest.fixture
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=0)
+
+    def test_rows_loaded_with_defaults(self, engine):
+        """COPY заповнює значення за замовчуванням і серіалізує JSON"""
+        records = [
+            {**_record(i), "user_preferences": {"diet": ["vegan"], "index": i}}
+            for i in range(3)
+        ]
+
+        async def copy():
+            async with AsyncSession(engine) as session:
+                copied = await User.copy_in(session, records)
+                await session.commit()
+            async with AsyncSession(engine) as session:
+                users = (await session.execute(select(User).order_by(User.username))).scalars()
+                return copied, [
+                    (user.email, user.user_preferences, user.id, user.created_at)
+                    for user in users
+                ]
+
+        copied, users = asyncio.run(copy())
+
+        assert copied == 3
+        assert [(email, preferences) for email, preferences, _, _ in users] == [
+            (record["email"], record["user_preferences"]) for record in records
+        ]
+        assert len({user_id for _, _, user_id, _ in users}) == 3
+        assert all(created_at is not None for _, _, _, created_at in users)
+
+
+@requires_db
+class TestCopyOut:
+    """Тести для потокового експорту рядків у CSV через COPY"""
+
+    @pytest.fixture
+    def engine(self, test_engine):
+        return _seed(test_engine, rows=3)
+
+    def test_export_contains_header_and_rows(self, engine):
+        """Експорт містить заголовок і лише стовпці схеми відповіді"""
+        async def export():
+            async with AsyncSession(engine) as session:
+                return b"".join([
+                    chunk async for chunk in UserService.export_users_csv(session)
+                ])
+
+        rows = list(csv.DictReader(io.StringIO(asyncio.run(export()).decode())))
+
+        assert sorted(row["email"] for row in rows) == [f"core_{i}@example.com" for i in range(3)]
+        assert "password_hash" not in rows[0]
+        assert set(rows[0]) <= set(UserResponse.model_fields)
+
+    def test_abandoned_export_releases_connection(self, engine):
+        """Перерваний експорт не залишає сесію в незавершеному COPY"""
+        async def export():
+            async with AsyncSession(engine) as session:
+                # Достатньо рядків, щоб COPY не вмістився в один фрагмент.
+                await User.copy_in(session, (_record(i) for i in range(3, 5000)))
+                await session.commit()
+
+                chunks = User.copy_out(session, buffer_chunks=1)
+                first = await anext(chunks)
+                await chunks.aclose()
+                await session.rollback()
+                count = (await session.execute(select(func.count(User.id)))).scalar_one()
+                return first, count
+
+        first, count = asyncio.run(export())
+
+        assert first.startswith(b"username,")
+        assert count == 5000
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.counting import RowCounter
+from src.database.deadlines import QueryDeadline, _current_deadline
+from src.tests.conftest import requires_db
+from src.user.models import User
+
+
+@requires_db
+class TestRowCounter:
+    """Тести для підрахунку рядків у списках"""
+
+    @pytest.fixture(scope="class")
+    def engine(self, test_engine):
+
+        async def seed():
+            async with AsyncSession(test_engine) as session:
+                await User.copy_in(session, (
+                    {
+                        "username": f"count_{i}",
+                        "name": "Count",
+                        "surname": "User",
+                        "email": f"count_{i}@example.com",
+                        "password_hash": "hash",
+                    }
+                    for i in range(50)
+                ))
+                await session.commit()
+
+        asyncio.run(seed())
+        return test_engine
+
+    @staticmethod
+    def _count(engine, counter, query):
+        async def count():
+            async with AsyncSession(engine) as session:
+                return await counter.count(session, query)
+
+        return asyncio.run(count())
+
+    def test_exact_below_threshold(self, engine):
+        """Нижче порогу кількість точна"""
+        result = self._count(engine, RowCounter(exact_threshold=100), select(User.id))
+
+        assert result.total == 50
+        assert result.exact
+
+    def test_estimate_above_threshold(self, engine):
+        """Вище порогу повертається оцінка, не менша за поріг"""
+        query = select(User.id).where(User.username >= "count_")
+        result = self._count(engine, RowCounter(exact_threshold=10), query)
+
+        assert result.total >= 11
+        assert not result.exact
+
+    def test_cached_exact_count_refreshed(self, engine):
+        """Точна кількість оновлюється у фоні та береться з кешу"""
+        counter = RowCounter(exact_threshold=10)
+
+        async def count_twice():
+            async with AsyncSession(engine) as session:
+                await counter.count(session, select(User.id))
+                await asyncio.gather(*counter._refreshing.values())
+                return await counter.count(session, select(User.id))
+
+        result = asyncio.run(count_twice())
+        assert result.total == 50
+        assert not result.exact
+
+    def test_refresh_ignores_request_deadline(self, engine):
+        """Фоновий точний підрахунок не успадковує дедлайн запиту"""
+        counter = RowCounter(exact_threshold=10)
+        # ~5 мс на рядок: повний підрахунок 50 рядків перевищує дедлайн.
+        slow = select(User.id).where(text("pg_sleep(0.005) IS NOT NULL"))
+
+        async def count_twice():
+            async with AsyncSession(engine) as session:
+                # Транзакцію розпочато до дедлайну, тож він діє лише на нові сесії.
+                await session.execute(text("SELECT 1"))
+                _current_deadline.set(QueryDeadline(statement_ms=100, lock_ms=100))
+                await counter.count(session, slow)
+                await asyncio.gather(*counter._refreshing.values())
+                return await counter.count(session, slow)
+
+        result = asyncio.run(count_twice())
+        assert result.total == 50
+
+    def test_refreshes_are_capped(self, engine):
+        """Кількість одночасних фонових підрахунків обмежена"""
+        counter = RowCounter(exact_threshold=10, max_refreshes=1)
+
+        async def count_many():
+            async with AsyncSession(engine) as session:
+                for i in range(5):
+                    await counter.count(session, select(User.id).where(User.name != f"other_{i}"))
+                refreshing = len(counter._refreshing)
+                await asyncio.gather(*counter._refreshing.values())
+                return refreshing, len(counter._cache)
+
+        assert asyncio.run(count_many()) == (1, 1)
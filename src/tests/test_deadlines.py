@@ -0,0 +1,54 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database.deadlines import database_error_handler, query_deadline
+from src.tests.conftest import database_url, requires_db
+
+
+@requires_db
+class TestQueryDeadlines:
+    """Тести для дедлайнів запитів маршрутів"""
+
+    @pytest.fixture
+    def client(self):
+        # Одне з'єднання в пулі: наступний запит отримає те саме з'єднання.
+        engine = create_async_engine(database_url(), pool_size=1, max_overflow=0)
+        session_factory = async_sessionmaker(bind=engine)
+
+        app = FastAPI()
+        app.add_exception_handler(DBAPIError, database_error_handler)
+
+        async def get_session():
+            async with session_factory() as session:
+                yield session
+
+        @app.get("/slow", dependencies=[Depends(query_deadline(50))])
+        async def slow(session=Depends(get_session)):
+            await session.execute(text("SELECT pg_sleep(1)"))
+
+        @app.get("/timeout")
+        async def timeout(session=Depends(get_session)):
+            result = await session.execute(text("SHOW statement_timeout"))
+            return result.scalar_one()
+
+        with TestClient(app) as client:
+            yield client
+
+    def test_deadline_exceeded_returns_503(self, client):
+        """Перевищений дедлайн повертає 503 з Retry-After"""
+        response = client.get("/slow")
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_connection_returns_clean(self, client):
+        """З'єднання повертається в пул без локального таймауту"""
+        assert client.get("/slow").status_code == 503
+
+        response = client.get("/timeout")
+        assert response.status_code == 200
+        assert response.json() == "0"
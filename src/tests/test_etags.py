@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from src.database.etags import etag_matches, make_etag
+
+
+class TestEtags:
+    """Тести для ETag профілів користувачів"""
+
+    def test_etag_changes_with_updated_at(self):
+        """ETag змінюється разом з updated_at"""
+        user_id = uuid4()
+        updated_at = datetime(2025, 9, 1, 12, 0, 0)
+
+        etag = make_etag(user_id, updated_at)
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == make_etag(user_id, updated_at)
+        assert etag != make_etag(user_id, updated_at + timedelta(microseconds=1))
+
+    def test_if_none_match(self):
+        """If-None-Match порівнює список тегів, ігноруючи W/"""
+        etag = make_etag(uuid4(), datetime(2025, 9, 1))
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
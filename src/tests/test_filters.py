@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from src.database.filters import FilterField, FilterSet, is_indexed
+from src.user.enums import UserSubscription
+from src.user.filters import UserFilters
+from src.user.models import User
+from src.user.schemas import UserFilterParams
+
+
+class TestUserFilters:
+    """Тести для фільтрів і сортування користувачів"""
+
+    def _sql(self, filters):
+        query = filters.sort(filters.filter(select(User.id)))
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    def test_filter_and_default_sort(self):
+        """Фільтр додається до WHERE, сортування за замовчуванням спадне"""
+        sql = self._sql(UserFilters({"subscription": UserSubscription.PRO}))
+
+        assert "WHERE users.user_subscription = " in sql
+        assert "ORDER BY users.created_at DESC, users.id DESC" in sql
+
+    def test_aware_dates_become_naive_utc(self):
+        """Дати з часовим поясом переводяться в наївний UTC"""
+        params = UserFilterParams(
+            created_after="2026-01-01T00:00:00Z",
+            created_before="2026-01-01T05:00:00+03:00",
+        )
+
+        assert params.created_after == datetime(2026, 1, 1)
+        assert params.created_before == datetime(2026, 1, 1, 2)
+
+    def test_ascending_sort(self):
+        """Сортування без мінуса зростаюче"""
+        filters = UserFilters(sort="username")
+
+        assert filters.sort_field == "username"
+        assert not filters.descending
+        assert "ORDER BY users.username, users.id" in self._sql(filters)
+
+    def test_unknown_sort_rejected(self):
+        """Сортування за неіндексованим полем заборонене"""
+        with pytest.raises(ValueError):
+            UserFilters(sort="-password_hash")
+
+    def test_unknown_filter_rejected(self):
+        """Невідомий фільтр заборонений"""
+        with pytest.raises(ValueError):
+            UserFilters({"name": "John"})
+
+    def test_unindexed_filter_fails_at_definition(self):
+        """Фільтр без індексу не можна оголосити"""
+        with pytest.raises(TypeError):
+            class NameFilters(FilterSet):
+                model = User
+                fields = {"name": FilterField("name")}
+
+    def test_contains_filter(self):
+        """Фільтр за алергеном використовує оператор вмісту JSONB"""
+        sql = self._sql(UserFilters({"allergy": "peanuts"}))
+
+        assert "users.user_preferences @> " in sql
+
+    def test_contains_requires_gin_index(self):
+        """Оператор вмісту потребує GIN-індексу, а сортування — B-tree"""
+        table = User.__table__
+
+        assert is_indexed(table, "user_preferences", "contains")
+        assert not is_indexed(table, "user_preferences")
+        assert not is_indexed(table, "created_at", "contains")
@@ -32,7 +32,7 @@ class TestAuthService:
     async def test_validate_user_credentials_success(self, mock_user):
         """Тест успішної валідації користувача"""
         with patch('src.auth.services.UserService.get_user_by_email', return_value=mock_user), \
-                patch('src.auth.services.bcrypt_context.verify', return_value=True):
+                patch('src.auth.services.verify_password', return_value=True):
             result = await AuthService.validate_user_credentials("daniel0629692@gmail.com", "string")
             assert result is True
 
@@ -47,7 +47,7 @@ class TestAuthService:
     async def test_validate_user_credentials_wrong_password(self, mock_user):
         """Тест з неправильним паролем"""
         with patch('src.auth.services.UserService.get_user_by_email', return_value=mock_user), \
-                patch('src.auth.services.bcrypt_context.verify', return_value=False):
+                patch('src.auth.services.verify_password', return_value=False):
             result = await AuthService.validate_user_credentials("daniel0629692@gmail.com", "wrongpassword")
             assert result is False
 
@@ -312,7 +312,7 @@ class TestIntegrationTests:
         user_login = UserLogin(email="daniel0629692@gmail.com", password="string")
 
         with patch('src.auth.services.UserService.get_user_by_email', return_value=mock_user), \
-                patch('src.auth.services.bcrypt_context.verify', return_value=True), \
+                patch('src.auth.services.verify_password', return_value=True), \
                 patch('src.auth.services.UserRefreshTokens.get_by_field', return_value=None), \
                 patch('src.auth.services.UserRefreshTokens.create') as mock_create:
             tokens = await AuthService.login_user(user_login)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.database.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+)
+from src.user.models import User
+
+
+class TestCursor:
+    """Тести для курсорної пагінації"""
+
+    def test_cursor_round_trip(self):
+        """Курсор декодується в ті самі значення"""
+        created_at = datetime(2025, 9, 1, 12, 30, 15, 123456)
+        user_id = uuid4()
+
+        cursor = encode_cursor("created_at", (created_at, user_id))
+        values = decode_cursor(cursor, "created_at", (User.created_at, User.id))
+
+        assert values == (created_at, user_id)
+
+    def test_cursor_for_other_sort_rejected(self):
+        """Курсор іншого сортування недійсний"""
+        cursor = encode_cursor("username", ("john", uuid4()))
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "created_at", (User.created_at, User.id))
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "W10", "WyJjcmVhdGVkX2F0Il0"])
+    def test_malformed_cursor_rejected(self, cursor):
+        """Пошкоджений курсор недійсний"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "created_at", (User.created_at, User.id))
+
+    def test_page_size_is_capped(self):
+        """Розмір сторінки обмежений"""
+        assert clamp_page_size(None) == DEFAULT_PAGE_SIZE
+        assert clamp_page_size(0) == DEFAULT_PAGE_SIZE
+        assert clamp_page_size(10) == 10
+        assert clamp_page_size(MAX_PAGE_SIZE * 10) == MAX_PAGE_SIZE
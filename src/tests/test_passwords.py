@@ -0,0 +1,118 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth import passwords
+
+
+class TestPasswordPool:
+    """Тести для пулу процесів хешування паролів"""
+
+    @pytest.fixture(autouse=True)
+    def pool(self):
+        yield
+        passwords.shutdown_password_pool()
+
+    def test_hash_and_verify(self):
+        """Хеш, створений у пулі, перевіряється в пулі"""
+        async def scenario():
+            password_hash = await passwords.hash_password("string")
+            return (
+                await passwords.verify_password("string", password_hash),
+                await passwords.verify_password("wrong", password_hash),
+            )
+
+        assert asyncio.run(scenario()) == (True, False)
+
+    def test_batch_keeps_order(self):
+        """Пакетне хешування зберігає порядок паролів"""
+        batch = [f"password_{i}" for i in range(5)]
+
+        with patch.object(passwords, "BATCH_CHUNK_SIZE", 2):
+            hashes = asyncio.run(passwords.hash_passwords(batch))
+
+        assert len(hashes) == len(batch)
+        assert passwords.pwd_context.verify(batch[0], hashes[0])
+        assert passwords.pwd_context.verify(batch[-1], hashes[-1])
+
+    def test_batch_uses_batch_workers(self):
+        """Пакет хешується на всіх виділених для пакетів процесах"""
+        running = peak = 0
+
+        async def run(func, chunk, rounds):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return chunk
+
+        with patch.object(passwords, "_run", run), \
+                patch.object(passwords, "PASSWORD_WORKERS", 4), \
+                patch.object(passwords, "PASSWORD_BATCH_WORKERS", 3):
+            asyncio.run(passwords.hash_passwords([f"password_{i}" for i in range(40)]))
+
+        assert peak == 3
+
+    def test_oversized_batch_rejected_early(self):
+        """Пакет, що не встигне за тайм-аут, відхиляється з 413 без хешування"""
+        with patch.object(passwords, "_hash_seconds", 0.25), \
+                patch.object(passwords, "PASSWORD_BATCH_TIMEOUT_SECONDS", 1), \
+                patch.object(passwords, "PASSWORD_BATCH_WORKERS", 2), \
+                patch.object(passwords, "_run") as run:
+            assert passwords.max_batch_size() == 8
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(passwords.hash_passwords(["string"] * 9))
+
+        assert error.value.status_code == 413
+        run.assert_not_called()
+
+    def test_saturated_pool_rejected(self):
+        """Переповнений пул одразу відповідає 503"""
+        limit = passwords.PASSWORD_WORKERS + passwords.PASSWORD_QUEUE_SIZE
+
+        with patch.object(passwords, "_in_flight", limit):
+            with pytest.raises(HTTPException) as error:
+                asyncio.run(passwords.hash_password("string"))
+
+        assert error.value.status_code == 503
+        assert error.value.headers["Retry-After"] == "1"
+
+    @pytest.mark.parametrize(("target_ms", "expected"), [(1, "min"), (10 ** 9, "max")])
+    def test_calibration_is_bounded(self, target_ms, expected):
+        """Калібрування не виходить за межі мінімальної та максимальної вартості"""
+        bounds = {"min": passwords.PASSWORD_MIN_ROUNDS, "max": passwords.PASSWORD_MAX_ROUNDS}
+
+        with patch.object(passwords, "PASSWORD_HASH_TARGET_MS", target_ms), \
+                patch.object(passwords, "pwd_context", passwords.pwd_context), \
+                patch.object(passwords, "_hash_seconds", None):
+            rounds = asyncio.run(passwords.calibrate_password_hashing())
+            assert rounds == bounds[expected]
+            assert passwords._current_rounds() == rounds
+
+    def test_calibration_uses_median(self):
+        """Один повільний замір не знижує вартість"""
+        # 62.5 мс на мінімальній вартості: ціль 250 мс дає ще два раунди.
+        samples = iter([0.5, 0.0625, 0.0625, 0.0625, 0.5])
+
+        async def run(func, *args):
+            return next(samples)
+
+        with patch.object(passwords, "_run", run), \
+                patch.object(passwords, "PASSWORD_HASH_TARGET_MS", 250), \
+                patch.object(passwords, "pwd_context", passwords.pwd_context), \
+                patch.object(passwords, "_hash_seconds", None):
+            rounds = asyncio.run(passwords.calibrate_password_hashing())
+
+        assert rounds == min(passwords.PASSWORD_MIN_ROUNDS + 2, passwords.PASSWORD_MAX_ROUNDS)
+
+    def test_needs_rehash_only_for_weaker_cost(self):
+        """Оновлюються лише помітно слабші хеші, сусідні вартості приймаються"""
+        current = passwords._current_rounds()
+
+        assert passwords.needs_rehash(passwords._context(4).hash("string"))
+        assert not passwords.needs_rehash(passwords._context(current - 1).hash("string"))
+        assert not passwords.needs_rehash(passwords._context(current + 1).hash("string"))
+        assert not passwords.needs_rehash(passwords.pwd_context.hash("string"))
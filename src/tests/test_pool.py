@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from src.database.pool import WAIT_BUCKETS, PoolMetrics, pool_limits
+
+
+class TestPoolSizing:
+    """Тести для розрахунку розміру пулу"""
+
+    def test_fixed_size_without_budget(self):
+        """Без бюджету використовуються задані значення"""
+        assert pool_limits(20, 30) == (20, 30)
+
+    def test_budget_is_split_between_workers(self):
+        """Бюджет з'єднань ділиться між воркерами"""
+        pool_size, max_overflow = pool_limits(
+            20, 30, connection_budget=100, workers=4, reserved=10
+        )
+
+        assert (pool_size + max_overflow) * 4 <= 100 - 10
+        assert pool_size == 11
+        assert max_overflow == 11
+
+    def test_at_least_one_connection_per_worker(self):
+        """Кожен воркер отримує хоча б одне з'єднання"""
+        assert pool_limits(20, 30, connection_budget=5, workers=16, reserved=10) == (1, 0)
+
+
+class TestPoolMetrics:
+    """Тести для гістограми очікування з'єднання"""
+
+    def test_wait_histogram_is_cumulative(self):
+        """Гістограма накопичувальна"""
+        metrics = PoolMetrics()
+        metrics.observe_wait(0.0005)
+        metrics.observe_wait(0.2)
+        metrics.observe_wait(60)
+
+        histogram = metrics.histogram()
+
+        assert metrics.checkouts == 3
+        assert histogram[str(WAIT_BUCKETS[0])] == 1
+        assert histogram["0.25"] == 2
+        assert histogram["+Inf"] == 3
+
+    def test_endpoint_requires_authentication(self):
+        """Метрики пулу недоступні без автентифікації"""
+        from src.api import app
+
+        response = TestClient(app).get("/metrics/db-pool")
+
+        assert response.status_code == 401
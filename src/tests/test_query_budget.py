@@ -0,0 +1,158 @@
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.auth.routers import auth_router
+from src.database.instrumentation import (
+    assert_max_queries,
+    instrument_engine,
+    track_queries,
+)
+from src.tests.conftest import requires_db
+from src.user.routers import user_router
+
+# Максимальна кількість SQL-запитів на один виклик кожного маршруту,
+# враховуючи запити залежності авторизації та встановлення дедлайнів
+# на початку кожної транзакції.
+ROUTE_BUDGETS = {
+    ("POST", "/user/create"): 1,
+    ("GET", "/user/get/all"): 6,
+    ("GET", "/user/get/all/stream"): 2,
+    ("GET", "/user/get/allergies/{allergen}"): 4,
+    ("GET", "/user/export/csv"): 1,
+    ("GET", "/user/get/email/{email}"): 4,
+    ("GET", "/user/get/id/{user_id}"): 4,
+    ("PATCH", "/user/update/{user_id}"): 3,
+    ("DELETE", "/user/delete/{user_id}"): 3,
+    ("POST", "/user/create-batch"): 1,
+    ("POST", "/user/user_info/create/{user_id}"): 1,
+    ("POST", "/login"): 3,
+    ("POST", "/token/refresh"): 3,
+    ("GET", "/protected_root"): 1,
+    ("POST", "/logout"): 0,
+    ("GET", "/.well-known/jwks.json"): 0,
+}
+
+
+def _routes(router):
+    for route in router.routes:
+        for method in route.methods:
+            yield method, route.path
+
+
+class TestQueryCounter:
+    """Тести для лічильника SQL-запитів"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        return engine
+
+    def test_counts_statements_inside_context(self, engine):
+        """Рахуються лише запити всередині контексту"""
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with track_queries() as stats:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+        assert stats.statements == 2
+        assert stats.db_time >= 0
+        assert stats.executed == ["SELECT 1", "SELECT 2"]
+
+    def test_budget_exceeded(self, engine):
+        """Перевищення бюджету запитів падає з переліком запитів"""
+        with pytest.raises(AssertionError, match="SELECT 2"):
+            with engine.connect() as conn, assert_max_queries(1):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+    def test_every_route_has_budget(self):
+        """Кожен маршрут має бюджет запитів"""
+        routes = set(_routes(user_router)) | set(_routes(auth_router))
+        assert routes == set(ROUTE_BUDGETS)
+
+
+@requires_db
+class TestRouteQueryBudgets:
+    """Бюджети запитів для маршрутів на тестовій базі"""
+
+    @pytest.fixture(scope="class")
+    def user(self, app_client):
+        suffix = uuid.uuid4().hex[:8]
+        payload = {
+            "username": f"budget_{suffix}",
+            "name": "Budget",
+            "surname": "User",
+            "email": f"budget_{suffix}@example.com",
+            "password": "string",
+        }
+        self._call(app_client, "POST", "/user/create", json=payload)
+        response = self._call(
+            app_client, "POST", "/login",
+            json={"email": payload["email"], "password": "string"},
+        )
+        return response.json() | app_client.get(f"/user/get/email/{payload['email']}").json()
+
+    @staticmethod
+    def _call(client, method, path, **kwargs):
+        template = kwargs.pop("template", path)
+        response = client.request(method, path, **kwargs)
+        assert response.status_code < 400, response.text
+
+        # Запити виконуються в потоці застосунку, тому рахуємо їх
+        # за заголовком, який додає middleware.
+        budget = ROUTE_BUDGETS[(method, template)]
+        queries = int(response.headers["X-DB-Queries"])
+        assert queries <= budget, f"{method} {path}: {queries} queries, budget {budget}"
+        return response
+
+    def test_read_routes(self, app_client, user):
+        """Маршрути читання вкладаються в бюджет"""
+        self._call(app_client, "GET", "/user/get/all")
+        self._call(app_client, "GET", "/user/get/all?include_total=true",
+                   template="/user/get/all")
+        self._call(app_client, "GET", "/user/get/all?created_after=2026-01-01T00:00:00Z",
+                   template="/user/get/all")
+        self._call(app_client, "GET", "/user/get/all/stream")
+        self._call(app_client, "GET", "/user/get/allergies/peanuts",
+                   template="/user/get/allergies/{allergen}")
+        self._call(app_client, "GET", "/user/export/csv")
+        self._call(app_client, "GET", f"/user/get/email/{user['email']}",
+                   template="/user/get/email/{email}")
+        response = self._call(app_client, "GET", f"/user/get/id/{user['id']}",
+                              template="/user/get/id/{user_id}")
+        not_modified = self._call(app_client, "GET", f"/user/get/id/{user['id']}",
+                                  template="/user/get/id/{user_id}",
+                                  headers={"If-None-Match": response.headers["ETag"]})
+        assert not_modified.status_code == 304
+        self._call(app_client, "GET", "/protected_root")
+        self._call(app_client, "GET", "/.well-known/jwks.json")
+
+    def test_write_routes(self, app_client, user):
+        """Маршрути запису вкладаються в бюджет"""
+        self._call(app_client, "PATCH", f"/user/update/{user['id']}",
+                   template="/user/update/{user_id}", json={"name": "Changed"})
+        self._call(app_client, "POST", f"/user/user_info/create/{user['id']}",
+                   template="/user/user_info/create/{user_id}",
+                   json={"user_gender": "FEMALE"})
+
+        suffix = uuid.uuid4().hex[:8]
+        batch = [
+            {
+                "username": f"batch_{suffix}_{i}",
+                "name": "Batch",
+                "surname": "User",
+                "email": f"batch_{suffix}_{i}@example.com",
+                "password": "string",
+            }
+            for i in range(3)
+        ]
+        created = self._call(app_client, "POST", "/user/create-batch", json=batch).json()["created"]
+        self._call(app_client, "DELETE", f"/user/delete/{created[0]['id']}",
+                   template="/user/delete/{user_id}")
+        self._call(app_client, "POST", "/token/refresh")
+        self._call(app_client, "POST", "/token/refresh?rotate=true", template="/token/refresh")
+        self._call(app_client, "POST", "/logout")
@@ -0,0 +1,152 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.blacklist import refresh_blacklist
+from src.auth.schemas import UserLogin
+from src.auth.services import AuthService
+from src.database.plans import capture_statements, find_seq_scans
+from src.database.services import utcnow_naive
+from src.tests.conftest import requires_db
+from src.user.enums import UserSubscription
+from src.user.filters import UserFilters
+from src.user.models import BlackedRefreshTokens, User, UserRefreshTokens
+from src.user.services import UserService
+
+HOT_TABLES = {"users", "refresh_tokens", "blacked_refresh_tokens"}
+SEED_ROWS = 5_000
+# Нижче цього розміру планувальник може обрати послідовне сканування
+# навіть за наявності індексу.
+SEQ_SCAN_MIN_ROWS = 1_000
+PASSWORD = "string"
+
+
+@requires_db
+class TestQueryPlans:
+    """Плани запитів на гарячих шляхах не містять послідовних сканувань"""
+
+    @pytest.fixture(scope="class")
+    def engine(self, test_engine):
+        password_hash = CryptContext(schemes=["bcrypt"]).hash(PASSWORD)
+
+        async def seed():
+
+            async with AsyncSession(test_engine) as session:
+                await User.copy_in(session, (
+                    {
+                        "username": f"plan_{i}",
+                        "name": "Plan",
+                        "surname": "User",
+                        "email": f"plan_{i}@example.com",
+                        "password_hash": password_hash,
+                        "user_subscription": UserSubscription.PRO if i % 10 == 0 else UserSubscription.FREE,
+                        "user_preferences": {
+                            "allergies": ["peanuts"] if i % 50 == 0 else [],
+                            "disliked_ingredients": ["onion"] if i % 7 == 0 else [],
+                        },
+                    }
+                    for i in range(SEED_ROWS)
+                ))
+                result = await session.execute(text("SELECT id, email FROM users"))
+                users = result.all()
+                # plan_0 ще не має refresh-токена, щоб логін його створив,
+                # а plan_44 не має заблокованих токенів, щоб його можна було видалити.
+                await UserRefreshTokens.copy_in(session, (
+                    {"user_id": user_id, "token": f"refresh_{user_id}"}
+                    for user_id, email in users if email != "plan_0@example.com"
+                ))
+                await BlackedRefreshTokens.copy_in(session, (
+                    {
+                        "user_id": user_id,
+                        "token": f"blacked_{user_id}",
+                        "expires_at": utcnow_naive() + timedelta(days=30),
+                    }
+                    for user_id, email in users if email != "plan_44@example.com"
+                ))
+                await session.commit()
+
+            async with test_engine.connect() as conn:
+                await conn.execute(text("ANALYZE"))
+
+        asyncio.run(seed())
+        return test_engine
+
+    def _assert_no_seq_scans(self, engine, flow):
+        async def run():
+            async with AsyncSession(engine) as session:
+                with capture_statements(engine.sync_engine) as statements:
+                    await flow(session)
+                connection = await session.connection()
+                scans = await find_seq_scans(
+                    connection, statements, HOT_TABLES, SEQ_SCAN_MIN_ROWS
+                )
+                await session.rollback()
+            return statements, scans
+
+        statements, scans = asyncio.run(run())
+        assert statements
+        assert not scans, "\n".join(
+            f"Seq Scan on {scan.table} ({scan.table_rows} rows): {scan.statement}"
+            for scan in scans
+        )
+        return statements
+
+    def test_user_reads(self, engine):
+        """Читання профілів та списків користувачів"""
+        async def flow(session):
+            profile = await UserService.get_user_profile("email", "plan_42@example.com", session)
+            await UserService.get_user_profile("id", profile["id"], session)
+            await UserService.get_user_by_email("plan_43@example.com", session)
+
+            _, cursor = await UserService.get_all_users(session, limit=20, filters=UserFilters())
+            await UserService.get_all_users(session, limit=20, cursor=cursor, filters=UserFilters())
+            await UserService.get_all_users(
+                session, limit=20, filters=UserFilters({"subscription": UserSubscription.PRO})
+            )
+            await UserService.get_all_users(session, limit=20, filters=UserFilters(sort="username"))
+            await UserService.get_all_users(
+                session, limit=20, filters=UserFilters({"allergy": "peanuts"})
+            )
+            await UserService.get_all_users(
+                session, limit=20, filters=UserFilters({"disliked_ingredient": "onion"})
+            )
+
+        self._assert_no_seq_scans(engine, flow)
+
+    def test_user_writes(self, engine):
+        """Оновлення та видалення користувачів"""
+        async def flow(session):
+            profile = await UserService.get_user_profile("email", "plan_44@example.com", session)
+            await UserService.update_user({"name": "Changed"}, profile["id"], session)
+            await UserService.delete_user(profile["id"], session)
+
+        self._assert_no_seq_scans(engine, flow)
+
+    def test_auth_paths(self, engine, monkeypatch):
+        """Логін, перевірка та ротація refresh-токенів"""
+        # Без завантаженого фільтра кожна перевірка чорного списку йде в БД.
+        monkeypatch.setattr(refresh_blacklist, "_filter", None)
+
+        async def flow(session):
+            tokens = await AuthService.login_user(
+                UserLogin(email="plan_0@example.com", password=PASSWORD), session
+            )
+            await AuthService.login_user(
+                UserLogin(email="plan_1@example.com", password=PASSWORD), session
+            )
+            assert await AuthService.validate_jwt_token(session, tokens["refresh_token"])
+            await AuthService.refresh_tokens(session, tokens["refresh_token"], rotate=True)
+            await BlackedRefreshTokens.prune_expired(session)
+
+        statements = self._assert_no_seq_scans(engine, flow)
+
+        executed = [captured.statement for captured in statements]
+        assert any(
+            statement.startswith("SELECT") and "FROM blacked_refresh_tokens" in statement
+            for statement in executed
+        )
+        assert any(statement.startswith("UPDATE refresh_tokens") for statement in executed)
@@ -0,0 +1,109 @@
+from itertools import cycle
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+
+import src.database.connection as connection
+from src.database.connection import (
+    UnitOfWorkRoute,
+    get_db,
+    get_read_db,
+    read_session_factory,
+)
+from src.database.routing import PRIMARY_PIN_COOKIE
+
+
+def _request(cookie: str | None = None) -> Request:
+    headers = [(b"cookie", cookie.encode())] if cookie else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class _StubSession:
+    def __init__(self, name: str):
+        self.name = name
+        self.info = {}
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class TestReadSessionFactory:
+    """Тести для вибору сесії читання між репліками та основною БД"""
+
+    @pytest.fixture
+    def replicas(self, monkeypatch):
+        replicas = [object(), object()]
+        monkeypatch.setattr(connection, "replica_sessions", replicas)
+        monkeypatch.setattr(connection, "_next_replica", cycle(replicas))
+        return replicas
+
+    def test_reads_go_to_replicas(self, replicas):
+        """Без cookie читання розподіляються між репліками по черзі"""
+        factories = [read_session_factory(_request()) for _ in range(3)]
+
+        assert factories == [replicas[0], replicas[1], replicas[0]]
+
+    def test_pinned_request_reads_primary(self, replicas):
+        """Після запису cookie закріплює читання за основною БД"""
+        factory = read_session_factory(_request(f"{PRIMARY_PIN_COOKIE}=1"))
+
+        assert factory is connection.async_session
+
+    def test_without_replicas_reads_primary(self, monkeypatch):
+        """Без налаштованих реплік читання йдуть в основну БД"""
+        monkeypatch.setattr(connection, "replica_sessions", [])
+
+        assert read_session_factory(_request()) is connection.async_session
+
+
+class TestReadSessionDependency:
+    """Тести для сесії читання в межах одного запиту"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        monkeypatch.setattr(connection, "async_session", lambda: _StubSession("primary"))
+        router = APIRouter(route_class=UnitOfWorkRoute)
+
+        @router.get("/sessions")
+        async def sessions(
+                session: AsyncSession = Depends(get_db),
+                read_session: AsyncSession = Depends(get_read_db),
+        ):
+            return {"shared": session is read_session, "read": read_session.name}
+
+        app = FastAPI()
+        app.include_router(router)
+        with TestClient(app) as client:
+            yield client
+
+    def test_primary_session_shared_without_replicas(self, client, monkeypatch):
+        """Без реплік читання використовує ту саму сесію, що й автентифікація"""
+        monkeypatch.setattr(connection, "replica_sessions", [])
+
+        assert client.get("/sessions").json() == {"shared": True, "read": "primary"}
+
+    def test_pinned_request_shares_primary_session(self, client, monkeypatch):
+        """Закріплений за основною БД запит не відкриває другу сесію"""
+        replicas = [lambda: _StubSession("replica")]
+        monkeypatch.setattr(connection, "replica_sessions", replicas)
+        monkeypatch.setattr(connection, "_next_replica", cycle(replicas))
+        client.cookies.set(PRIMARY_PIN_COOKIE, "1")
+
+        assert client.get("/sessions").json() == {"shared": True, "read": "primary"}
+
+    def test_replica_gets_own_session(self, client, monkeypatch):
+        """Читання з репліки йде окремою сесією"""
+        replicas = [lambda: _StubSession("replica")]
+        monkeypatch.setattr(connection, "replica_sessions", replicas)
+        monkeypatch.setattr(connection, "_next_replica", cycle(replicas))
+
+        assert client.get("/sessions").json() == {"shared": False, "read": "replica"}
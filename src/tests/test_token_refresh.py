@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import pytest
+
+from src.auth.blacklist import refresh_blacklist
+from src.auth.services import AuthService
+from src.auth.tokens_processing import decode_token
+from src.tests.conftest import requires_db
+
+
+@requires_db
+class TestTokenRefresh:
+    """Тести для оновлення токенів без повторного входу"""
+
+    @pytest.fixture
+    def tokens(self, app_client):
+        email = f"refresh_{uuid.uuid4().hex[:8]}@example.com"
+        app_client.post("/user/create", json={
+            "username": email.split("@")[0],
+            "name": "Refresh",
+            "surname": "User",
+            "email": email,
+            "password": "string",
+        })
+        response = app_client.post("/login", json={"email": email, "password": "string"})
+        app_client.cookies.clear()
+        return response.json()
+
+    def test_refresh_issues_access_token(self, app_client, tokens):
+        """Refresh-токен з тіла запиту видає новий access-токен"""
+        response = app_client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+        assert response.status_code == 200
+        assert response.json()["refresh_token"] == tokens["refresh_token"]
+        assert app_client.get("/protected_root").status_code == 200
+
+    def test_rotated_token_cannot_be_reused(self, app_client, tokens):
+        """Після ротації старий refresh-токен більше не приймається"""
+        old_token = tokens["refresh_token"]
+        response = app_client.post("/token/refresh?rotate=true", json={"refresh_token": old_token})
+
+        assert response.status_code == 200
+        new_token = response.json()["refresh_token"]
+        assert new_token != old_token
+
+        assert app_client.post("/token/refresh", json={"refresh_token": old_token}).status_code == 401
+        assert app_client.post("/token/refresh", json={"refresh_token": new_token}).status_code == 200
+
+    def test_access_token_is_not_a_refresh_token(self, app_client, tokens):
+        """Access-токен не можна використати для оновлення"""
+        response = app_client.post("/token/refresh", json={"refresh_token": tokens["access_token"]})
+
+        assert response.status_code == 401
+
+    def test_rolled_back_rotation_keeps_old_token(self, app_client, tokens):
+        """Відкочена ротація не додає старий токен до чорного списку процесу"""
+        import src.database.connection as connection
+
+        old_token = tokens["refresh_token"]
+
+        async def rotate_and_roll_back():
+            async with connection.async_session() as session:
+                await AuthService.rotate_refresh_token(session, old_token, decode_token(old_token))
+                await session.rollback()
+
+        asyncio.run(rotate_and_roll_back())
+
+        assert not refresh_blacklist.might_contain(old_token)
+        assert app_client.post("/token/refresh", json={"refresh_token": old_token}).status_code == 200
+
+    def test_token_rotated_by_another_worker_rejected(self, app_client, tokens):
+        """Токен, ротований іншим процесом, відхиляється ще до синхронізації фільтра"""
+        import src.database.connection as connection
+
+        old_token = tokens["refresh_token"]
+
+        async def rotate_elsewhere():
+            # Коміт без колбеків: фільтр цього процесу про ротацію не знає.
+            async with connection.async_session() as session:
+                await AuthService.rotate_refresh_token(session, old_token, decode_token(old_token))
+                await session.commit()
+
+        asyncio.run(rotate_elsewhere())
+
+        assert not refresh_blacklist.might_contain(old_token)
+        assert app_client.post("/token/refresh", json={"refresh_token": old_token}).status_code == 401
+
+        app_client.cookies.set("refresh_token", old_token)
+        assert app_client.get("/protected_root").status_code == 401
@@ -0,0 +1,74 @@
+import pytest
+import rsa
+from jose import JWTError, jwt
+
+from config import SECRET_KEY
+from src.auth import tokens_processing
+from src.auth.tokens_processing import KeySet, decode_token, encode_token
+
+
+class TestTokenSigning:
+    """Тести для підпису токенів RS256 з ідентифікаторами ключів"""
+
+    @pytest.fixture(scope="class")
+    def keys_dir(self, tmp_path_factory):
+        directory = tmp_path_factory.mktemp("keys")
+        for kid in ("2025-01", "2025-02"):
+            _, private_key = rsa.newkeys(1024)
+            (directory / f"{kid}.pem").write_bytes(private_key.save_pkcs1())
+        return directory
+
+    @pytest.fixture
+    def key_set(self, keys_dir, monkeypatch):
+        key_set = KeySet.from_directory(str(keys_dir), active_kid="2025-02")
+        monkeypatch.setattr(tokens_processing, "key_set", key_set)
+        tokens_processing.claims_cache.clear()
+        return key_set
+
+    def test_token_verifies_with_published_key(self, key_set):
+        """Токен перевіряється відкритим ключем з JWKS за kid"""
+        token = encode_token({"sub": "user@example.com"})
+
+        header = jwt.get_unverified_header(token)
+        assert header == {"alg": "RS256", "kid": "2025-02", "typ": "JWT"}
+
+        public_key = next(key for key in key_set.jwks["keys"] if key["kid"] == header["kid"])
+        assert "d" not in public_key
+        assert jwt.decode(token, public_key, "RS256")["sub"] == "user@example.com"
+        assert decode_token(token)["sub"] == "user@example.com"
+
+    def test_all_keys_are_published(self, key_set):
+        """JWKS містить і активний, і попередній ключ"""
+        assert {key["kid"] for key in key_set.jwks["keys"]} == {"2025-01", "2025-02"}
+
+    def test_legacy_token_is_accepted(self, key_set):
+        """Токени HS256, видані до переходу, приймаються"""
+        token = jwt.encode({"sub": "user@example.com"}, SECRET_KEY, "HS256")
+
+        assert decode_token(token)["sub"] == "user@example.com"
+
+    def test_legacy_token_rejected_when_disabled(self, key_set, monkeypatch):
+        """Після вимкнення HS256 старі токени відхиляються"""
+        monkeypatch.setattr(tokens_processing, "JWT_ACCEPT_HS256", False)
+        token = jwt.encode({"sub": "user@example.com"}, SECRET_KEY, "HS256")
+
+        with pytest.raises(JWTError):
+            decode_token(token)
+
+    def test_unknown_kid_is_rejected(self, key_set):
+        """Токен з невідомим kid відхиляється"""
+        _, private_key = rsa.newkeys(1024)
+        token = jwt.encode(
+            {"sub": "user@example.com"},
+            private_key.save_pkcs1().decode(),
+            "RS256",
+            headers={"kid": "unknown"},
+        )
+
+        with pytest.raises(JWTError):
+            decode_token(token)
+
+    def test_unknown_active_kid_fails_fast(self, keys_dir):
+        """Неіснуючий активний kid — помилка конфігурації"""
+        with pytest.raises(ValueError):
+            KeySet.from_directory(str(keys_dir), active_kid="missing")
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.database.connection import UnitOfWorkRoute, get_db, on_commit
+from src.tests.conftest import requires_db
+from src.user.models import User
+
+
+def _user(email: str) -> User:
+    return User(
+        username=email.split("@")[0],
+        name="Unit",
+        surname="Work",
+        email=email,
+        password_hash="hash",
+    )
+
+
+@requires_db
+class TestUnitOfWork:
+    """Тести для коміту одиниці роботи до відправлення відповіді"""
+
+    @pytest.fixture(scope="class")
+    def engine(self, test_engine):
+        async def seed():
+            async with AsyncSession(test_engine) as session:
+                session.add(_user("taken@example.com"))
+                await session.commit()
+
+        asyncio.run(seed())
+        return test_engine
+
+    @pytest.fixture
+    def client(self, engine, monkeypatch):
+        import src.database.connection as connection
+
+        monkeypatch.setattr(
+            connection, "async_session", async_sessionmaker(bind=engine, expire_on_commit=False)
+        )
+
+        self.committed = []
+        router = APIRouter(route_class=UnitOfWorkRoute)
+
+        @router.post("/users/{email}")
+        async def add_user(email: str, session: AsyncSession = Depends(get_db)):
+            # Без flush: унікальний індекс спрацює лише під час коміту.
+            session.add(_user(email))
+            on_commit(session, self._mark_committed(email))
+            return {"email": email}
+
+        app = FastAPI()
+        app.include_router(router)
+        with TestClient(app, raise_server_exceptions=False) as client:
+            yield client
+
+    def _mark_committed(self, email):
+        async def mark():
+            self.committed.append(email)
+        return mark
+
+    def test_failed_commit_returns_5xx(self, client):
+        """Помилка під час коміту повертає 5xx, а не успішну відповідь"""
+        response = client.post("/users/taken@example.com")
+
+        assert response.status_code == 500
+        assert self.committed == []
+
+    def test_commit_callbacks_run_before_response(self, client):
+        """Колбеки після коміту виконуються до відправлення відповіді"""
+        response = client.post("/users/new@example.com")
+
+        assert response.status_code == 200
+        assert self.committed == ["new@example.com"]
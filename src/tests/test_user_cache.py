@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime
+from time import perf_counter
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from src.cache import TTLCache
+from src.database.connection import DatabaseSession, on_commit
+from src.tests.conftest import requires_db
+from src.user.cache import UserCache, redis_client
+from src.user.schemas import UserResponse
+
+
+def _profile(**kwargs):
+    now = datetime(2025, 9, 1, 12, 0)
+    return UserResponse(
+        id=uuid4(), username="cached", name="Cached", surname="User",
+        email="cached@example.com", created_at=now, updated_at=now, **kwargs,
+    )
+
+
+class TestUserCache:
+    """Тести для дворівневого кешу користувачів"""
+
+    def test_local_tier(self):
+        """Локальний рівень повертає збережений профіль до інвалідації"""
+        cache = UserCache(TTLCache(maxsize=10, ttl=60))
+        profile = _profile()
+
+        async def scenario():
+            await cache.set(profile.id, profile)
+            cached = await cache.get(profile.id)
+            await cache.invalidate(profile.id)
+            return cached, await cache.get(profile.id)
+
+        assert asyncio.run(scenario()) == (profile, None)
+
+    def test_shared_tier_invalidation(self):
+        """Інвалідація в Redis видна іншим процесам"""
+        fakeredis = pytest.importorskip("fakeredis")
+        redis = fakeredis.FakeAsyncRedis()
+        writer = UserCache(TTLCache(maxsize=10, ttl=60), redis)
+        reader = UserCache(TTLCache(maxsize=10, ttl=60), redis)
+        profile = _profile(user_preferences={"allergies": ["peanuts"]})
+
+        async def scenario():
+            await writer.set(profile.id, profile)
+            shared = await reader.get(profile.id)
+            reader.local.clear()
+            await writer.invalidate(profile.id)
+            return shared, await reader.get(profile.id)
+
+        assert asyncio.run(scenario()) == (profile, None)
+
+    def test_unresponsive_redis_falls_back(self):
+        """Redis, що не відповідає, не блокує запит довше за тайм-аут"""
+        profile = _profile()
+
+        async def scenario():
+            # Сервер приймає з'єднання, але ніколи не відповідає.
+            server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            cache = UserCache(
+                TTLCache(maxsize=10, ttl=60),
+                redis_client(f"redis://127.0.0.1:{port}", timeout=0.1),
+            )
+            async with server:
+                started = perf_counter()
+                cached = await cache.get(profile.id)
+                await cache.set(profile.id, profile)
+                return cached, perf_counter() - started
+
+        cached, elapsed = asyncio.run(scenario())
+
+        assert cached is None
+        assert elapsed < 1
+
+
+@requires_db
+class TestCommitCallbacks:
+    """Тести для колбеків після коміту одиниці роботи"""
+
+    @pytest.fixture
+    def session_factory(self, test_engine):
+        return async_sessionmaker(bind=test_engine)
+
+    def test_runs_only_after_commit(self, session_factory):
+        """Колбек виконується після коміту і не виконується після відкату"""
+        calls = []
+
+        async def callback():
+            calls.append("called")
+
+        async def scenario():
+            async with DatabaseSession(session_factory) as session:
+                on_commit(session, callback)
+
+            with pytest.raises(RuntimeError):
+                async with DatabaseSession(session_factory) as session:
+                    on_commit(session, callback)
+                    raise RuntimeError
+
+        asyncio.run(scenario())
+        assert calls == ["called"]
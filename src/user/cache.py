@@ -0,0 +1,88 @@
+from logging import getLogger
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from config import (
+    USER_CACHE_LOCAL_SECONDS,
+    USER_CACHE_REDIS_SECONDS,
+    USER_CACHE_REDIS_TIMEOUT_SECONDS,
+    USER_CACHE_REDIS_URL,
+    USER_CACHE_SIZE,
+)
+from src.cache import TTLCache
+from src.user.schemas import UserResponse
+
+logger = getLogger(__name__)
+
+
+class UserCache:
+
+    def __init__(
+            self,
+            local: TTLCache,
+            redis: Redis | None = None,
+            redis_ttl: int = USER_CACHE_REDIS_SECONDS,
+    ):
+        self.local = local
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+
+    @staticmethod
+    def _key(user_id: Any) -> str:
+        return f"user:{user_id}"
+
+    async def get(self, user_id: Any) -> UserResponse | None:
+        key = self._key(user_id)
+        user = self.local.get(key)
+        if user is not None or self.redis is None:
+            return user
+
+        try:
+            raw = await self.redis.get(key)
+        except RedisError:
+            logger.warning("User cache read from Redis failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+
+        user = UserResponse.model_validate_json(raw)
+        self.local.set(key, user)
+        return user
+
+    async def set(self, user_id: Any, user: UserResponse) -> None:
+        key = self._key(user_id)
+        self.local.set(key, user)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.set(key, user.model_dump_json(), ex=self.redis_ttl)
+        except RedisError:
+            logger.warning("User cache write to Redis failed", exc_info=True)
+
+    async def invalidate(self, user_id: Any) -> None:
+        key = self._key(user_id)
+        self.local.pop(key)
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.delete(key)
+        except RedisError:
+            logger.warning("User cache invalidation in Redis failed", exc_info=True)
+
+
+def redis_client(url: str, timeout: float = USER_CACHE_REDIS_TIMEOUT_SECONDS) -> Redis:
+    # Every cache miss on a protected request goes through here, so an
+    # unreachable Redis must fail fast into the RedisError fallback.
+    return Redis.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+
+
+# The local tier cannot see invalidations made by other workers, so it is
+# kept short; Redis is the shared tier that writes invalidate everywhere.
+user_cache = UserCache(
+    TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_LOCAL_SECONDS),
+    redis_client(USER_CACHE_REDIS_URL) if USER_CACHE_REDIS_URL else None,
+)
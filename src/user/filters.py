@@ -0,0 +1,17 @@
+from src.database.filters import FilterField, FilterSet
+from src.user.models import User
+
+
+class UserFilters(FilterSet):
+    model = User
+    fields = {
+        "subscription": FilterField("user_subscription"),
+        "gender": FilterField("user_gender"),
+        "created_after": FilterField("created_at", "ge"),
+        "created_before": FilterField("created_at", "le"),
+        "allergy": FilterField("user_preferences", "contains", key="allergies"),
+        "disliked_ingredient": FilterField(
+            "user_preferences", "contains", key="disliked_ingredients"
+        ),
+    }
+    sort_fields = ("created_at", "username")
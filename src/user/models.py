@@ -2,14 +2,37 @@ from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
 
-from sqlalchemy import DECIMAL, JSON, DateTime, ForeignKey, String, Uuid
+from sqlalchemy import (
+    DECIMAL,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Uuid,
+    any_,
+    func,
+    select,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from src.database.services import CoreModel
+from src.database.services import CoreModel, utcnow_naive
 
 
 class User(CoreModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_subscription_created_at_id", "user_subscription", "created_at", "id"),
+        Index("ix_users_gender_created_at_id", "user_gender", "created_at", "id"),
+        Index(
+            "ix_users_user_preferences",
+            "user_preferences",
+            postgresql_using="gin",
+            postgresql_ops={"user_preferences": "jsonb_path_ops"},
+        ),
+    )
 
     username: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     name: Mapped[str] = mapped_column(String, nullable=False)
@@ -18,7 +41,7 @@ class User(CoreModel):
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
     user_gender: Mapped[str] = mapped_column(String, nullable=True)
     user_birthday: Mapped[datetime] = mapped_column(DateTime, nullable=True)
-    user_preferences: Mapped[dict] = mapped_column(JSON, nullable=True)
+    user_preferences: Mapped[dict] = mapped_column(JSONB, nullable=True)
     user_avatar: Mapped[str] = mapped_column(String, nullable=True)
     user_weight: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
     user_height: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -40,19 +63,41 @@ class User(CoreModel):
 class BlackedRefreshTokens(CoreModel):
     __tablename__ = "blacked_refresh_tokens"
 
-    user_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("users.id"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("users.id"), nullable=False, index=True)
     token: Mapped[str] = mapped_column(String, unique=True, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
 
     user: Mapped["User"] = relationship(
         "User",
         back_populates="blacked_refresh_tokens",
     )
 
+    @classmethod
+    async def prune_expired(
+            cls,
+            session: AsyncSession,
+            now: datetime | None = None,
+            batch_size: int = 5000,
+    ) -> int:
+        # An expired token fails signature validation on its own,
+        # so its blacklist entry is dead weight from that moment.
+        expired = (
+            select(cls.id)
+            .where(cls.expires_at < (now or utcnow_naive()))
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        # id = ANY(ARRAY(...)) keeps the delete on the primary key index;
+        # a plain IN (...) lets the planner hash-join against a full scan.
+        return await cls.delete(session, cls.id == any_(func.array(expired)))
+
 
 class UserRefreshTokens(CoreModel):
     __tablename__ = "refresh_tokens"
 
-    user_id: Mapped[UUID] = mapped_column(Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id: Mapped[UUID] = mapped_column(
+        Uuid, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     token: Mapped[str] = mapped_column(String, unique=True, nullable=False)
 
     user: Mapped[User] = relationship(
@@ -1,15 +1,33 @@
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import DB_LIST_STATEMENT_TIMEOUT_MS
 from src.auth.routers import auth_dependency
-from src.database.connection import get_db
+from src.database.connection import (
+    UnitOfWorkRoute,
+    get_db,
+    get_read_db,
+    read_session_factory,
+)
+from src.database.deadlines import query_deadline
+from src.database.etags import etag_matches, make_etag
+from src.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from src.user import schemas as user_schemas
-from src.user.models import User
+from src.user.filters import UserFilters
 from src.user.services import UserService
 
-user_router = APIRouter(prefix="/user", tags=["user"])
+user_router = APIRouter(prefix="/user", tags=["user"], route_class=UnitOfWorkRoute)
+
+# Hard cap per request. Smaller batches can still get 413 when hashing
+# them would take longer than PASSWORD_BATCH_TIMEOUT_SECONDS.
+MAX_BATCH_SIZE = 1000
+
+list_deadline = Depends(query_deadline(DB_LIST_STATEMENT_TIMEOUT_MS))
+lookup_deadline = Depends(query_deadline())
 
 
 @user_router.post("/create", response_model=user_schemas.UserResponse)
@@ -26,47 +44,143 @@ async def create_user(
         )
 
 
-@user_router.get("/get/all")
+@user_router.get("/get/all", response_model=user_schemas.UserPage, dependencies=[list_deadline])
 async def get_all_users(
         auth_user: auth_dependency,
-        session: AsyncSession = Depends(get_db),
-) -> list[user_schemas.UserResponse]:
+        params: Annotated[user_schemas.UserFilterParams, Depends()],
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+        include_total: bool = False,
+        session: AsyncSession = Depends(get_read_db),
+):
+    try:
+        filters = UserFilters(params.model_dump(exclude={"sort"}), sort=params.sort)
+        users, next_cursor = await UserService.get_all_users(
+            session, limit=limit, cursor=cursor, filters=filters
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
-    return await UserService.get_all_users(session)
+    page = {"items": users, "next_cursor": next_cursor}
+    if include_total:
+        count = await UserService.count_users(session, filters)
+        page.update(total=count.total, total_exact=count.exact)
+    return page
 
 
-@user_router.get("/get/email/{email}", response_model=user_schemas.UserResponse)
-async def get_user_by_email(
-        email: str,
+@user_router.get(
+    "/get/allergies/{allergen}", response_model=user_schemas.UserPage,
+    dependencies=[list_deadline],
+)
+async def get_users_with_allergy(
+        allergen: str,
         auth_user: auth_dependency,
-        session: AsyncSession = Depends(get_db),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = None,
+        session: AsyncSession = Depends(get_read_db),
+):
+    try:
+        users, next_cursor = await UserService.get_all_users(
+            session, limit=limit, cursor=cursor, filters=UserFilters({"allergy": allergen})
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return {"items": users, "next_cursor": next_cursor}
+
+
+@user_router.get("/get/all/stream")
+async def stream_all_users(request: Request, auth_user: auth_dependency):
+    session_factory = read_session_factory(request)
+
+    async def ndjson_lines():
+        async with session_factory() as session:
+            async for chunk in UserService.stream_users_ndjson(session):
+                yield chunk
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@user_router.get("/export/csv")
+async def export_users_csv(request: Request, auth_user: auth_dependency):
+    session_factory = read_session_factory(request)
+
+    async def csv_chunks():
+        async with session_factory() as session:
+            async for chunk in UserService.export_users_csv(session):
+                yield chunk
+
+    return StreamingResponse(
+        csv_chunks(),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+    )
+
+
+async def _get_profile(
+        field_name: str,
+        value: Any,
+        request: Request,
+        response: Response,
+        session: AsyncSession,
 ):
-    print(f"User email: {email}")
-    user = await UserService.get_user_by_email(email, session)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Revalidation only needs (id, updated_at), not the whole profile.
+        version = await UserService.get_user_version(field_name, value, session)
+        if version and etag_matches(if_none_match, make_etag(*version)):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": make_etag(*version)},
+            )
+
+    user = await UserService.get_user_profile(field_name, value, session)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    response.headers["ETag"] = make_etag(user["id"], user["updated_at"])
     return user
 
 
-@user_router.get("/get/id/{user_id}", response_model=user_schemas.UserResponse)
+@user_router.get(
+    "/get/email/{email}", response_model=user_schemas.UserResponse,
+    dependencies=[lookup_deadline],
+)
+async def get_user_by_email(
+        email: str,
+        request: Request,
+        response: Response,
+        auth_user: auth_dependency,
+        session: AsyncSession = Depends(get_read_db),
+):
+    return await _get_profile("email", email, request, response, session)
+
+
+@user_router.get(
+    "/get/id/{user_id}", response_model=user_schemas.UserResponse,
+    dependencies=[lookup_deadline],
+)
 async def get_user_by_id(
         user_id: UUID,
+        request: Request,
+        response: Response,
         auth_user: auth_dependency,
-        session: AsyncSession = Depends(get_db)
+        session: AsyncSession = Depends(get_read_db)
 ):
-    user = await User.get_by_field(session, 'id', user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    return await _get_profile("id", user_id, request, response, session)
 
 
-@user_router.patch("/update/{user_id}", response_model=user_schemas.UserResponse)
+@user_router.patch(
+    "/update/{user_id}", response_model=user_schemas.UserResponse,
+    dependencies=[lookup_deadline],
+)
 async def update_user(
         user_id: UUID,
         auth_user: auth_dependency,
@@ -89,7 +203,7 @@ async def update_user(
     return updated_user
 
 
-@user_router.delete("/delete/{user_id}")
+@user_router.delete("/delete/{user_id}", dependencies=[lookup_deadline])
 async def delete_user(
         user_id: UUID,
         auth_user: auth_dependency,
@@ -104,15 +218,15 @@ async def delete_user(
     return {"message": "User deleted successfully"}
 
 
-@user_router.post("/create-batch", response_model=list[user_schemas.UserResponse])
+@user_router.post("/create-batch", response_model=user_schemas.UserBatchResult)
 async def create_users_batch(
         users: list[user_schemas.UserCreate],
         session: AsyncSession = Depends(get_db)
 ):
-    if len(users) > 100:
+    if len(users) > MAX_BATCH_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Too many users in batch (max 100)"
+            detail=f"Too many users in batch (max {MAX_BATCH_SIZE})"
         )
 
     return await UserService.create_users_batch(users, session)
@@ -1,8 +1,8 @@
 import decimal
-from datetime import datetime
+from datetime import UTC, datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 
 from src.user import enums as user_enums
 
@@ -58,6 +58,40 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserFilterParams(BaseModel):
+    subscription: user_enums.UserSubscription | None = None
+    gender: user_enums.UserGender | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    allergy: str | None = None
+    disliked_ingredient: str | None = None
+    sort: str | None = None
+
+    @field_validator("created_after", "created_before")
+    @classmethod
+    def to_naive_utc(cls, value: datetime | None) -> datetime | None:
+        # created_at is stored as naive UTC; asyncpg rejects comparing it
+        # with an aware value.
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+class UserPage(BaseModel):
+    items: list[UserResponse]
+    next_cursor: str | None = None
+    total: int | None = None
+    total_exact: bool | None = None
+
+class RejectedUser(BaseModel):
+    index: int
+    username: str
+    email: str
+    reason: str = "Email or username already exists"
+
+class UserBatchResult(BaseModel):
+    created: list[UserResponse]
+    rejected: list[RejectedUser]
+
 class CreateUserInfo(BaseModel):
     user_gender: user_enums.UserGender | None = None
     user_birthday: datetime | None = None
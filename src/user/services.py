@@ -1,33 +1,36 @@
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from passlib.context import CryptContext
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import defer
 
+from config import (
+    COUNT_CACHE_SECONDS,
+    COUNT_CACHE_SIZE,
+    COUNT_EXACT_THRESHOLD,
+    COUNT_MAX_REFRESHES,
+)
+from src.auth.passwords import hash_password, hash_passwords
+from src.database.connection import on_commit, with_db_session
+from src.database.counting import RowCount, RowCounter
 from src.user import (
     schemas as user_schemas,  #import UserCreate, UserResponse, UserUpdate
 )
+from src.user.cache import user_cache
+from src.user.filters import UserFilters
 from src.user.models import User
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12
+user_counter = RowCounter(
+    COUNT_EXACT_THRESHOLD, COUNT_CACHE_SECONDS, COUNT_CACHE_SIZE, COUNT_MAX_REFRESHES
 )
 
-password_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="password_")
-
 
 class UserService:
 
-    @classmethod
-    async def _hash_password_async(cls, password: str) -> str:
-        return await asyncio.to_thread(pwd_context.hash, password)
-
     @classmethod
     async def create_user_service(
             cls,
@@ -35,9 +38,7 @@ class UserService:
             session: AsyncSession
     ) -> User:
 
-        await cls._validate_user_uniqueness(user_to_create, session)
-
-        password_hash = await cls._hash_password_async(user_to_create.password)
+        password_hash = await hash_password(user_to_create.password)
 
         user_data = {
             "username": user_to_create.username,
@@ -54,7 +55,10 @@ class UserService:
             'user_subscription': None,
         }
 
-        return await User.create(user_data, session)
+        user = await User.create(user_data, session, ignore_conflicts=True)
+        if user is None:
+            await cls._validate_user_uniqueness(user_to_create, session)
+        return user
 
     @classmethod
     async def _validate_user_uniqueness(
@@ -63,37 +67,73 @@ class UserService:
             session: AsyncSession
     ) -> None:
 
-        existing_user = await User.get_by_field(
-            session, "email", user_data.email
-        )
-        if existing_user:
-            raise ValueError("Email already exists")
-
-        existing_user = await User.get_by_field(
-            session, "username", user_data.username
+        query = select(User.email, User.username).where(
+            or_(User.email == user_data.email, User.username == user_data.username)
         )
-        if existing_user:
-            raise ValueError("Username already exists")
+        result = await session.execute(query)
+        for email, _ in result.all():
+            if email == user_data.email:
+                raise ValueError("Email already exists")
+        raise ValueError("Username already exists")
 
     @classmethod
     async def get_all_users(
             cls,
             session: AsyncSession,
+            limit: int | None = None,
+            cursor: str | None = None,
             prefetch: Any | None = None,
             options: list[Any] | None = None,
-            filters: dict[str, Any] | None = None,
-    ) -> list[User]:
+            filters: UserFilters | None = None,
+    ) -> tuple[list[User], str | None]:
 
         base_options = [defer(User.password_hash)]
         if options:
             base_options.extend(options)
 
-        return await User.all(
+        return await User.paginate(
             session=session,
+            limit=limit,
+            cursor=cursor,
             prefetch=prefetch,
+            filters=filters,
             options=base_options,
         )
 
+    @classmethod
+    async def count_users(
+            cls,
+            session: AsyncSession,
+            filters: UserFilters | None = None,
+    ) -> RowCount:
+        query = select(User.id)
+        if filters:
+            query = filters.filter(query)
+        return await user_counter.count(session, query)
+
+    @classmethod
+    async def stream_users_ndjson(
+            cls,
+            session: AsyncSession,
+            batch_size: int = 500,
+    ) -> AsyncIterator[str]:
+        batches = User.stream(
+            session,
+            options=[defer(User.password_hash)],
+            sort_by_creation=True,
+            batch_size=batch_size,
+        )
+        async for users in batches:
+            yield "".join(
+                user_schemas.UserResponse.model_validate(user).model_dump_json() + "\n"
+                for user in users
+            )
+
+    @classmethod
+    def export_users_csv(cls, session: AsyncSession) -> AsyncIterator[bytes]:
+        columns = User._columns_for(user_schemas.UserResponse)
+        return User.copy_out(session, columns)
+
     @classmethod
     async def get_user_by_email(
             cls,
@@ -102,6 +142,26 @@ class UserService:
     ) -> User | None:
         return await User.get_by_field(session, "email", email)
 
+    @classmethod
+    async def get_user_profile(
+            cls,
+            field_name: str,
+            value: Any,
+            session: AsyncSession
+    ) -> dict[str, Any] | None:
+        return await User.get_projection_by_field(
+            session, field_name, value, user_schemas.UserResponse
+        )
+
+    @classmethod
+    async def get_user_version(
+            cls,
+            field_name: str,
+            value: Any,
+            session: AsyncSession
+    ) -> tuple[UUID, datetime] | None:
+        return await User.get_version_by_field(session, field_name, value)
+
     @classmethod
     async def update_user(
             cls,
@@ -111,7 +171,9 @@ class UserService:
     ) -> User | None:
 
         where_clause = User.id == user_id
-        return await User.update(session, user_data, where_clause)
+        user = await User.update(session, user_data, where_clause)
+        cls._invalidate_cached_user(user_id, session)
+        return user
 
     @classmethod
     async def delete_user(
@@ -120,37 +182,43 @@ class UserService:
             session: AsyncSession
     ) -> int:
         where_clause = User.id == user_id
-        return await User.delete(session, where_clause)
+        deleted = await User.delete(session, where_clause)
+        cls._invalidate_cached_user(user_id, session)
+        return deleted
 
     @classmethod
     async def create_users_batch(
             cls,
             users_data: list[user_schemas.UserCreate],
             session: AsyncSession
-    ) -> list[User]:
+    ) -> dict[str, list[Any]]:
 
-        password_tasks = [
-            cls._hash_password_async(user.password)
-            for user in users_data
+        password_hashes = await hash_passwords([user.password for user in users_data])
+
+        records = [
+            {
+                "username": user_data.username,
+                "name": user_data.name,
+                "surname": user_data.surname,
+                "email": user_data.email,
+                "password_hash": password_hash,
+            }
+            for user_data, password_hash in zip(users_data, password_hashes, strict=True)
         ]
-        password_hashes = await asyncio.gather(*password_tasks)
-
-        users = []
-        for user_data, password_hash in zip(users_data, password_hashes, strict=False):
-            user = User(
-                username=user_data.username,
-                name=user_data.name,
-                surname=user_data.surname,
-                email=user_data.email,
-                password_hash=password_hash,
-            )
-            users.append(user)
 
-        # Batch insert
-        session.add_all(users)
-        await session.commit()
+        created, rejected = await User.bulk_create(session, records)
 
-        return users
+        return {
+            "created": created,
+            "rejected": [
+                {
+                    "index": index,
+                    "username": users_data[index].username,
+                    "email": users_data[index].email,
+                }
+                for index in rejected
+            ],
+        }
 
     @classmethod
     async def save_user_data(
@@ -159,16 +227,62 @@ class UserService:
             users_data: dict[str, Any],
             session: AsyncSession,
     ):
-        user = await User.get_by_field(session, 'id', user_id)
-        print(f'User found: {user}')
+        where_clause=(User.id == user_id)
+        user = await User.update(
+            session,
+            users_data,
+            where_clause,
+            )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        where_clause=(User.id == user_id)
-        await User.update(
+        cls._invalidate_cached_user(user_id, session)
+
+    @classmethod
+    @with_db_session
+    async def rehash_password(
+            cls,
+            user_id: UUID,
+            password: str,
+            old_hash: str,
+            session: AsyncSession | None = None,
+    ) -> bool:
+        new_hash = await hash_password(password)
+        # Matching the old hash keeps a password change that landed in
+        # the meantime from being overwritten.
+        updated = await User.update(
             session,
-            users_data,
-            where_clause,
-            )
+            {"password_hash": new_hash},
+            (User.id == user_id) & (User.password_hash == old_hash),
+        )
+        return updated is not None
+
+    @staticmethod
+    def _invalidate_cached_user(user_id: UUID, session: AsyncSession) -> None:
+        # Invalidating before the commit would let a concurrent request
+        # re-cache the old row, so it runs once the change is durable.
+        on_commit(session, lambda: user_cache.invalidate(user_id))
+
+    @classmethod
+    async def get_authenticated_user(
+            cls,
+            claims: dict[str, Any],
+            session: AsyncSession
+    ) -> User | None:
+        if claims.get("user_id") is None:
+            return await cls.get_user_by_email(claims["sub"], session=session)
+
+        user_id = UUID(claims["user_id"])
+        profile = await user_cache.get(user_id)
+        if profile is None:
+            row = await cls.get_user_profile("id", user_id, session)
+            if row is None:
+                return None
+            profile = user_schemas.UserResponse.model_validate(row)
+            await user_cache.set(user_id, profile)
+
+        # A detached User built from the cached profile; it carries no
+        # password hash and is never attached to the session.
+        return User(**profile.model_dump())
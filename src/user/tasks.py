@@ -0,0 +1,38 @@
+import asyncio
+from logging import getLogger
+
+from src.celery_app.celery_app import celery
+from src.database.connection import engine, with_db_session
+from src.user.models import BlackedRefreshTokens
+
+logger = getLogger(__name__)
+
+PRUNE_BATCH_SIZE = 5000
+
+
+@with_db_session
+async def _prune_batch(session=None) -> int:
+    return await BlackedRefreshTokens.prune_expired(session, batch_size=PRUNE_BATCH_SIZE)
+
+
+async def prune_expired_tokens() -> int:
+    pruned = 0
+    try:
+        # Each batch commits on its own so a large backlog never holds
+        # row locks on the blacklist for the whole run.
+        while True:
+            deleted = await _prune_batch()
+            pruned += deleted
+            if deleted < PRUNE_BATCH_SIZE:
+                break
+    finally:
+        # Pooled connections belong to the event loop asyncio.run created.
+        await engine.dispose()
+    return pruned
+
+
+@celery.task
+def prune_blacklisted_tokens() -> int:
+    pruned = asyncio.run(prune_expired_tokens())
+    logger.info("Pruned %s expired blacklisted refresh tokens", pruned)
+    return pruned